@@ -0,0 +1,207 @@
+"""
+ARCHIVO: benchmark.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Mide GrafoRutas sobre redes sintéticas de distintos tamaños:
+             carga, consultas de ruta por algoritmo, modificaciones y
+             serialización del mapa. Guarda los resultados en JSON para
+             comparar entre commits.
+
+USO:
+    python benchmark.py --tamanos 1000,10000 --salida benchmark.json
+    python benchmark.py --generadores geometrico --algoritmos dijkstra,astar
+
+DEPENDENCIAS: argparse, json, platform, random, statistics, subprocess, time,
+              models.generador_redes, models.grafo_rutas, views.mapa_view
+"""
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+from models.generador_redes import generar_geometrico, generar_rejilla
+from models.grafo_rutas import ALGORITMOS, GrafoRutas
+from views.mapa_view import MapaView
+
+GENERADORES = {
+    'rejilla': lambda n, semilla: generar_rejilla(
+        round(n ** 0.5), round(n ** 0.5), semilla=semilla),
+    'geometrico': lambda n, semilla: generar_geometrico(n, semilla=semilla),
+}
+
+
+def cronometrar(funcion):
+    """Retorna (resultado, milisegundos)"""
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return resultado, (time.perf_counter() - inicio) * 1000
+
+
+def resumen(tiempos):
+    """Media, mediana, p95 y máximo de una lista de milisegundos"""
+    if not tiempos:
+        return None
+    ordenados = sorted(tiempos)
+    return {
+        'n': len(ordenados),
+        'media_ms': round(statistics.fmean(ordenados), 4),
+        'p50_ms': round(ordenados[len(ordenados) // 2], 4),
+        'p95_ms': round(ordenados[min(len(ordenados) - 1,
+                                      int(len(ordenados) * 0.95))], 4),
+        'max_ms': round(ordenados[-1], 4),
+    }
+
+
+def medir_consultas(grafo, pares, algoritmos):
+    """Tiempo por consulta y discrepancias frente a Dijkstra"""
+    referencia = {}
+    resultados = {}
+    for algoritmo in algoritmos:
+        tiempos = []
+        sin_camino = 0
+        discrepancias = 0
+        for origen, destino in pares:
+            try:
+                ruta, ms = cronometrar(
+                    lambda: grafo.dijkstra(origen, destino, 'distancia', algoritmo))
+            except ValueError:
+                sin_camino += 1
+                continue
+            tiempos.append(ms)
+            esperado = referencia.setdefault((origen, destino), ruta['distancia'])
+            if abs(esperado - ruta['distancia']) > 1e-6:
+                discrepancias += 1
+        resultados[algoritmo] = {
+            **(resumen(tiempos) or {}),
+            'sin_camino': sin_camino,
+            'discrepancias': discrepancias,
+        }
+    return resultados
+
+
+def medir_modificaciones(grafo, azar, repeticiones):
+    """Agregar/eliminar rutas y ciudades, con y sin instantánea vigente"""
+    ciudades = list(grafo.ciudades)
+    tiempos = {'agregar_ruta': [], 'eliminar_ruta': [], 'agregar_ciudad': [],
+               'eliminar_ciudad': [], 'agregar_ruta_con_instantanea': []}
+
+    for i in range(repeticiones):
+        ciudad1, ciudad2 = azar.sample(ciudades, 2)
+        if (ciudad1, ciudad2) in grafo.conexiones:
+            continue
+        pesos = {'distancia': 1.0, 'tiempo': 0.1}
+        _, ms = cronometrar(lambda: grafo.agregar_ruta(ciudad1, ciudad2, pesos))
+        tiempos['agregar_ruta'].append(ms)
+        _, ms = cronometrar(lambda: grafo.eliminar_ruta(ciudad1, ciudad2))
+        tiempos['eliminar_ruta'].append(ms)
+
+        # Con una instantánea vigente la primera escritura copia contenedores
+        grafo.instantanea()
+        _, ms = cronometrar(lambda: grafo.agregar_ruta(ciudad1, ciudad2, pesos))
+        tiempos['agregar_ruta_con_instantanea'].append(ms)
+        grafo.eliminar_ruta(ciudad1, ciudad2)
+
+        nombre = f"_bench_{i}"
+        _, ms = cronometrar(lambda: grafo.agregar_ciudad(nombre, 1, 1))
+        tiempos['agregar_ciudad'].append(ms)
+        _, ms = cronometrar(lambda: grafo.eliminar_ciudad(nombre))
+        tiempos['eliminar_ciudad'].append(ms)
+
+    return {operacion: resumen(valores) for operacion, valores in tiempos.items()}
+
+
+def medir_serializacion(grafo):
+    """obtener_estado + formateo + JSON del mapa completo"""
+    estado, ms_estado = cronometrar(grafo.obtener_estado)
+    cuerpo, ms_json = cronometrar(
+        lambda: MapaView.serializar_mapa(MapaView.formatear_datos_mapa(estado)))
+    return {
+        'obtener_estado_ms': round(ms_estado, 3),
+        'json_ms': round(ms_json, 3),
+        'bytes': len(cuerpo),
+    }
+
+
+def ejecutar(tamano, generador, algoritmos, consultas, modificaciones, semilla):
+    azar = random.Random(semilla)
+    datos, ms_generar = cronometrar(lambda: GENERADORES[generador](tamano, semilla))
+    grafo, ms_carga = cronometrar(lambda: GrafoRutas(datos))
+    ciudades = list(grafo.ciudades)
+    pares = [tuple(azar.sample(ciudades, 2)) for _ in range(consultas)]
+
+    resultado = {
+        'generador': generador,
+        'tamano_pedido': tamano,
+        'ciudades': len(grafo.ciudades),
+        'rutas': len(grafo.conexiones) // 2,
+        'generar_ms': round(ms_generar, 3),
+        'carga_ms': round(ms_carga, 3),
+    }
+    if 'ch' in algoritmos:
+        _, ms = cronometrar(lambda: grafo.preprocesar_jerarquias(('distancia',)))
+        resultado['preproceso_ch_ms'] = round(ms, 3)
+
+    resultado['consultas'] = medir_consultas(grafo, pares, algoritmos)
+    resultado['modificaciones'] = medir_modificaciones(grafo, azar, modificaciones)
+    resultado['serializacion'] = medir_serializacion(grafo)
+    return resultado
+
+
+def metadatos():
+    """Versión del código y del entorno para comparar ejecuciones"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('USO:')[0])
+    parser.add_argument('--tamanos', default='1000,10000',
+                        help='Cantidades de ciudades separadas por coma')
+    parser.add_argument('--generadores', default=','.join(GENERADORES))
+    parser.add_argument('--algoritmos', default='dijkstra,astar,bidireccional,ch')
+    parser.add_argument('--consultas', type=int, default=50)
+    parser.add_argument('--modificaciones', type=int, default=20)
+    parser.add_argument('--semilla', type=int, default=1)
+    parser.add_argument('--salida', default='benchmark.json')
+    argumentos = parser.parse_args()
+
+    algoritmos = argumentos.algoritmos.split(',')
+    for algoritmo in algoritmos:
+        if algoritmo not in ALGORITMOS:
+            parser.error(f"Algoritmo {algoritmo} no soportado")
+    generadores = argumentos.generadores.split(',')
+    for generador in generadores:
+        if generador not in GENERADORES:
+            parser.error(f"Generador {generador} no soportado")
+
+    resultados = []
+    for tamano in (int(t) for t in argumentos.tamanos.split(',')):
+        for generador in generadores:
+            print(f"⏱️  {generador} con {tamano} ciudades...")
+            resultados.append(ejecutar(
+                tamano, generador, algoritmos, argumentos.consultas,
+                argumentos.modificaciones, argumentos.semilla))
+
+    with open(argumentos.salida, 'w', encoding='utf-8') as archivo:
+        json.dump({'meta': metadatos(), 'resultados': resultados},
+                  archivo, ensure_ascii=False, indent=2)
+    print(f"✅ Resultados guardados en {argumentos.salida}")
+
+
+if __name__ == '__main__':
+    main()
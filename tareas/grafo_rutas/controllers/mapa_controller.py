@@ -4,34 +4,191 @@ AUTOR: Lorgio Añez J.
 FECHA: 2025-10-23
 DESCRIPCIÓN: Controlador principal que coordina operaciones entre modelo y vista.
              Gestiona ciudades, rutas y cálculo de caminos mínimos.
-DEPENDENCIAS: models.grafo_rutas, views.mapa_view
+DEPENDENCIAS: models.grafo_rutas, models.cache_rutas, models.diario_eventos,
+              models.trabajos (consultas pesadas en otros procesos),
+              models.matriz_costos (umbral para repartir una matriz),
+              models.importador (carga masiva en flujo), time,
+              views.mapa_view,
+              hashlib y threading (mapa serializado con ETag por versión),
+              atexit y os (instantánea binaria guardada tras los cambios),
+              functools (fábrica del controlador en los procesos de trabajos)
 """
 
+import atexit
+import functools
+import hashlib
+import os
+import threading
+import time
+
+from models.cache_rutas import CacheRutas
+from models.diario_eventos import DiarioEventos
 from models.grafo_rutas import GrafoRutas
-from views.mapa_view import MapaView
+from models.importador import leer_lotes
+from models.matriz_costos import MIN_BUSQUEDAS_PARALELO
+from models.trabajos import GestorTrabajos, en_proceso_trabajador
+from views.mapa_view import CRITERIOS, MapaView
+
+# Métodos que pueden ejecutarse como trabajos asíncronos (async=true)
+METODOS_ASINCRONOS = ('resolver_ruta', 'calcular_pareto', 'calcular_alternativas',
+                      'calcular_lote', 'calcular_matriz')
+
+# Con menos orígenes distintos que esto un lote no se reparte entre procesos
+MIN_GRUPOS_PARALELO = 8
+
+# Segundos sin cambios tras los que se guarda la instantánea binaria
+ESPERA_GUARDADO = 2
 
 
 class MapaController:
-    def __init__(self, modelo=None, vista=None):
+    def __init__(self, modelo=None, vista=None, archivo=None, depurar=True):
+        # Con 'archivo' el mapa se carga de su instantánea binaria (si existe)
+        # y se vuelve a guardar allí después de cada ráfaga de cambios
+        if modelo is None and archivo and os.path.exists(archivo):
+            modelo = GrafoRutas()
+            modelo.cargar_binario(archivo)
         self.modelo = modelo or GrafoRutas.crear_grafo_bolivia()
         self.vista = vista or MapaView()
+        # Caché LRU de rutas calculadas, invalidada por la versión del grafo
+        self.cache_rutas = CacheRutas()
+        # Mapa completo ya serializado: (versión, cuerpo JSON, ETag)
+        self._mapa_serializado = None
+        self._candado_mapa = threading.Lock()
+        # Diario de cambios del grafo (eventos SSE y puesta al día)
+        self.eventos = DiarioEventos(self.modelo.version)
+        self.modelo.suscribir(self.eventos.registrar)
+        # Pool de procesos con copias del grafo; cada proceso crea su propio
+        # controlador (sin mensajes de depuración) con la copia como modelo
+        self.trabajos = GestorTrabajos(functools.partial(type(self), depurar=False))
+        self.archivo = archivo
+        # Guardado diferido: los cambios solo anotan su hora y un único
+        # temporizador guarda cuando pasan ESPERA_GUARDADO segundos sin otros
+        self._ultimo_cambio = None
+        self._temporizador = None
+        self._candado_guardado = threading.Lock()   # solo para los dos campos
+        self._candado_escritura = threading.Lock()  # un guardado a la vez
+        if archivo:
+            self.modelo.suscribir(self._programar_guardado)
+            atexit.register(self.guardar_mapa, solo_pendiente=True)
 
-        print(f"🔍 DEBUG - Ciudades en modelo: {len(self.modelo.ciudades)}")
-        print(f"🔍 DEBUG - Conexiones en modelo: {len(self.modelo.conexiones)}")
-        print(
-            f"🔍 DEBUG - Ciudades específicas: {list(self.modelo.ciudades.keys())}")
-        print("✅ Controlador MVC inicializado correctamente")
+        if depurar:
+            print(f"🔍 DEBUG - Ciudades en modelo: {len(self.modelo.ciudades)}")
+            print(f"🔍 DEBUG - Conexiones en modelo: {len(self.modelo.conexiones)}")
+            print(
+                f"🔍 DEBUG - Ciudades específicas: {list(self.modelo.ciudades.keys())}")
+            print("✅ Controlador MVC inicializado correctamente")
 
     def obtener_grafo(self):
         """✅ NUEVO MÉTODO: Retorna la instancia actual del grafo"""
         return self.modelo
 
-    def obtener_mapa(self):
+    def obtener_instantanea(self):
+        """Instantánea de solo lectura del grafo para una consulta completa"""
+        return self.modelo.instantanea()
+
+    def obtener_mapa(self, grafo=None):
         """Obtiene los datos del mapa formateados para la vista"""
-        datos_modelo = self.modelo.obtener_estado()
+        datos_modelo = (grafo or self.obtener_instantanea()).obtener_estado()
         return self.vista.formatear_datos_mapa(datos_modelo)
 
-    def calcular_ruta(self, origen, destino, criterio='distancia'):
+    def obtener_mapa_serializado(self):
+        """Retorna (cuerpo, etag, version) del mapa completo en JSON.
+
+        Se serializa una sola vez por versión del grafo; mientras no haya
+        cambios las consultas reutilizan los mismos bytes.
+        """
+        with self._candado_mapa:
+            grafo = self.obtener_instantanea()
+            version = grafo.version
+            if self._mapa_serializado is None or self._mapa_serializado[0] != version:
+                cuerpo = self.vista.serializar_mapa(self.obtener_mapa(grafo))
+                etag = hashlib.sha1(cuerpo).hexdigest()[:20]
+                self._mapa_serializado = (version, cuerpo, etag)
+            version, cuerpo, etag = self._mapa_serializado
+            return cuerpo, etag, version
+
+    def _programar_guardado(self, evento):
+        """Anota el cambio y arma el temporizador si no hay uno en marcha.
+
+        Se ejecuta con el candado del grafo tomado (desde _notificar): no
+        debe esperar a un guardado en curso, que a su vez necesita ese
+        candado para tomar la instantánea.
+        """
+        with self._candado_guardado:
+            self._ultimo_cambio = time.monotonic()
+            if self._temporizador is None:
+                self._armar_temporizador(ESPERA_GUARDADO)
+
+    def _armar_temporizador(self, espera):
+        self._temporizador = threading.Timer(espera, self._guardar_tras_espera)
+        self._temporizador.daemon = True
+        self._temporizador.start()
+
+    def _guardar_tras_espera(self):
+        """Guarda si ya pasaron ESPERA_GUARDADO segundos desde el último
+        cambio; si no, vuelve a esperar lo que falta"""
+        with self._candado_guardado:
+            if self._ultimo_cambio is not None:
+                espera = self._ultimo_cambio + ESPERA_GUARDADO - time.monotonic()
+                if espera > 0:
+                    self._armar_temporizador(espera)
+                    return
+            self._temporizador = None
+        self.guardar_mapa(solo_pendiente=True)
+
+    def guardar_mapa(self, solo_pendiente=False):
+        """Guarda la instantánea binaria de la versión actual en self.archivo.
+
+        El archivo se escribe sin el candado de guardado: los cambios que
+        lleguen mientras tanto no esperan al disco y arman otro guardado.
+        """
+        with self._candado_guardado:
+            pendiente = self._ultimo_cambio is not None
+            self._ultimo_cambio = None
+            if self._temporizador is not None:
+                self._temporizador.cancel()
+                self._temporizador = None
+        if solo_pendiente and not pendiente:
+            return
+        with self._candado_escritura:
+            self.modelo.guardar_binario(self.archivo)
+
+    def obtener_cambios(self, desde):
+        """Cambios posteriores a la versión 'desde' para ponerse al día.
+
+        Si el diario ya no cubre esa versión se envía el mapa completo.
+        """
+        try:
+            valido, error = self.vista.validar_version(desde)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            grafo = self.obtener_instantanea()
+            eventos = self.eventos.desde(int(desde))
+            mapa = self.obtener_mapa(grafo) if eventos is None else None
+            return self.vista.formatear_cambios(grafo.version, eventos, mapa)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def obtener_mapa_en_vista(self, datos):
+        """Obtiene solo la parte del mapa dentro de un rectángulo de vista"""
+        try:
+            valido, error = self.vista.validar_datos_vista(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            rectangulo = [float(datos[campo])
+                          for campo in ('xmin', 'ymin', 'xmax', 'ymax')]
+            zoom = float(datos['zoom']) if datos.get('zoom') is not None else None
+            datos_modelo = self.obtener_instantanea().estado_en_vista(
+                *rectangulo, zoom=zoom)
+            return self.vista.formatear_datos_mapa(datos_modelo)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def calcular_ruta(self, origen, destino, criterio='distancia', algoritmo='dijkstra'):
         """✅ ACTUALIZADO: Calcula la ruta óptima entre dos ciudades con criterio"""
         try:
             valido, error = self.vista.validar_datos_ruta_calculo({
@@ -42,12 +199,338 @@ class MapaController:
             if not valido:
                 return self.vista.formatear_error(error)
 
-            resultado = self.modelo.dijkstra(origen, destino, criterio)
+            resultado = self.obtener_instantanea().dijkstra(
+                origen, destino, criterio, algoritmo)
             return self.vista.formatear_respuesta_ruta(resultado)
 
         except Exception as e:
             return self.vista.formatear_error(str(e))
 
+    def resolver_ruta(self, datos, grafo=None, traza=None):
+        """Ruta de /api/ruta: directa, con un intermedio o con varias paradas.
+
+        Retorna la respuesta ya formateada y lanza ValueError si no hay
+        camino (como GrafoRutas.dijkstra); 'grafo' es la instantánea que
+        fija la consulta y 'traza' el destino opcional de los pasos.
+        """
+        grafo = grafo or self.obtener_instantanea()
+        origen = datos.get('origen')
+        destino = datos.get('destino')
+        intermedio = datos.get('intermedio')
+        intermedios = datos.get('intermedios') or []
+        optimizar = bool(datos.get('optimizar', False))
+        criterio = datos.get('criterio', 'distancia')
+        algoritmo = datos.get('algoritmo', 'dijkstra')
+        salida = self.vista.leer_salida(datos.get('salida'))
+
+        # ✅ VARIAS PARADAS: árboles por parada y orden opcional óptimo
+        if intermedios:
+            if salida is not None:
+                raise ValueError("La hora de salida no admite varias paradas")
+            resultado = grafo.ruta_con_paradas(
+                origen, destino, intermedios, criterio, optimizar)
+
+        # ✅ CALCULAR RUTA CON/SIN PUNTO INTERMEDIO
+        elif intermedio:
+            # Origen → Intermedio → Destino (la traza recibe ambos tramos)
+            # (con hora de salida, el segundo tramo sale al llegar al intermedio)
+            ruta1 = grafo.dijkstra(
+                origen, intermedio, criterio, algoritmo, traza, salida)
+            ruta2 = grafo.dijkstra(
+                intermedio, destino, criterio, algoritmo, traza,
+                ruta1.get('llegada'))
+
+            # COMBINAR RUTAS
+            camino_completo = ruta1['camino'][:-1] + \
+                ruta2['camino']  # Evitar duplicar intermedio
+            distancia_total = ruta1['distancia'] + ruta2['distancia']
+
+            resultado = {
+                'camino': camino_completo,
+                'distancia': distancia_total
+            }
+            if salida is not None:
+                resultado['salida'] = salida
+                resultado['llegada'] = ruta2['llegada']
+        else:
+            # RUTA DIRECTA
+            resultado = grafo.dijkstra(
+                origen, destino, criterio, algoritmo, traza, salida)
+
+        respuesta = {
+            'camino': resultado['camino'],
+            'distancia': resultado['distancia'],
+            'criterio': criterio,
+            'algoritmo': algoritmo
+        }
+        for campo in ('orden', 'salida', 'llegada'):
+            if campo in resultado:
+                respuesta[campo] = resultado[campo]
+        return respuesta
+
+    def enviar_trabajo(self, metodo, datos):
+        """Encola metodo(datos) en el pool de procesos; retorna su id"""
+        try:
+            if metodo not in METODOS_ASINCRONOS:
+                return self.vista.formatear_error(
+                    f"{metodo} no admite ejecución asíncrona")
+            identificador = self.trabajos.enviar(
+                self.obtener_instantanea(), metodo, datos)
+            return self.vista.formatear_trabajo_enviado(identificador)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def consultar_trabajo(self, identificador, espera=0):
+        """Estado de un trabajo asíncrono (y su resultado si terminó)"""
+        try:
+            valido, error = self.vista.validar_espera(espera)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            estado = self.trabajos.consultar(identificador, float(espera))
+            if estado is None:
+                return self.vista.formatear_error(
+                    f"El trabajo {identificador} no existe")
+            return self.vista.formatear_estado_trabajo(estado)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def calcular_pareto(self, datos):
+        """Calcula el frente de Pareto distancia/tiempo entre dos ciudades"""
+        try:
+            valido, error = self.vista.validar_datos_ruta_calculo(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            argumentos = {}
+            if datos.get('max_etiquetas') is not None:
+                argumentos['max_etiquetas'] = int(datos['max_etiquetas'])
+                if argumentos['max_etiquetas'] < 1:
+                    return self.vista.formatear_error(
+                        "max_etiquetas debe ser mayor a 0")
+
+            resultado = self.obtener_instantanea().rutas_pareto(
+                datos['origen'], datos['destino'], **argumentos)
+            return self.vista.formatear_respuesta_pareto(resultado)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def calcular_alternativas(self, datos):
+        """Calcula las k rutas alternativas más cortas entre dos ciudades"""
+        try:
+            valido, error = self.vista.validar_datos_alternativas(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            criterio = datos.get('criterio', 'distancia')
+            rutas = self.obtener_instantanea().rutas_alternativas(
+                datos['origen'], datos['destino'], int(datos.get('k') or 3),
+                criterio)
+            return self.vista.formatear_respuesta_alternativas(rutas, criterio)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def calcular_alcance(self, datos):
+        """Ciudades alcanzables desde un origen dentro de un presupuesto"""
+        try:
+            valido, error = self.vista.validar_datos_alcance(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            origen = datos['origen']
+            presupuesto = float(datos['presupuesto'])
+            criterio = datos.get('criterio', 'distancia')
+            alcanzables = self.obtener_instantanea().alcance(origen, presupuesto, criterio)
+            return self.vista.formatear_respuesta_alcance(
+                origen, presupuesto, criterio, alcanzables)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def buscar_cercanas(self, datos):
+        """Las k ciudades más cercanas a un punto del mapa"""
+        try:
+            valido, error = self.vista.validar_datos_cercanas(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            x, y = float(datos['x']), float(datos['y'])
+            cercanas = self.obtener_instantanea().ciudades_cercanas(
+                x, y, int(datos.get('k', 1)))
+            return self.vista.formatear_respuesta_cercanas(x, y, cercanas)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def buscar_en_rectangulo(self, datos):
+        """Ciudades dentro de un rectángulo del mapa"""
+        try:
+            valido, error = self.vista.validar_datos_rectangulo(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            rectangulo = [float(datos[campo])
+                          for campo in ('xmin', 'ymin', 'xmax', 'ymax')]
+            ciudades = self.obtener_instantanea().ciudades_en_rectangulo(*rectangulo)
+            return self.vista.formatear_respuesta_rectangulo(rectangulo, ciudades)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def calcular_lote(self, datos):
+        """Calcula un lote de rutas agrupando los pares por origen.
+
+        Cada grupo comparte una sola búsqueda (GrafoRutas.rutas_desde). Las
+        búsquedas son Python puro y los hilos no las acelerarían (GIL): con
+        muchos orígenes los grupos se reparten por bloques en el pool de
+        procesos de los trabajos (ver _matriz_costos). Con 'pasos' se usa
+        dijkstra por par para incluir la traza, igual que /api/ruta.
+        """
+        try:
+            valido, error = self.vista.validar_datos_lote(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            criterio = datos.get('criterio', 'distancia')
+            incluir_pasos = bool(datos.get('pasos', False))
+            pares = [
+                (p['origen'], p['destino']) if isinstance(p, dict) else tuple(p)
+                for p in datos['pares']
+            ]
+
+            grupos = {}
+            for origen, destino in pares:
+                grupos.setdefault(origen, []).append(destino)
+
+            # Todos los grupos consultan la misma versión del grafo
+            grafo = self.obtener_instantanea()
+            if (en_proceso_trabajador() or self.trabajos.procesos == 1
+                    or len(grupos) < MIN_GRUPOS_PARALELO):
+                por_origen = self._resolver_grupos(
+                    grafo, grupos, criterio, incluir_pasos)
+            else:
+                origenes = list(grupos)
+                tamano = -(-len(origenes) // self.trabajos.procesos)
+                por_origen = {}
+                for parte in self.trabajos.repartir(grafo, 'resolver_grupos', [
+                        {'grupos': {o: grupos[o] for o in origenes[i:i + tamano]},
+                         'criterio': criterio, 'pasos': incluir_pasos}
+                        for i in range(0, len(origenes), tamano)]):
+                    por_origen.update(parte)
+
+            resultados = [
+                {'origen': origen, 'destino': destino,
+                 **por_origen[origen][destino]}
+                for origen, destino in pares
+            ]
+            return self.vista.formatear_respuesta_lote(resultados, criterio)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def resolver_grupos(self, datos):
+        """Rutas de un bloque de grupos {origen: destinos} de un lote (lo
+        ejecutan los procesos del pool para calcular_lote)"""
+        return self._resolver_grupos(
+            self.modelo, datos['grupos'], datos['criterio'], datos['pasos'])
+
+    @staticmethod
+    def _resolver_grupos(grafo, grupos, criterio, incluir_pasos):
+        """{origen: {destino: ruta o error}} para cada grupo del lote"""
+        por_origen = {}
+        for origen, destinos in grupos.items():
+            if not incluir_pasos:
+                por_origen[origen] = grafo.rutas_desde(origen, destinos, criterio)
+                continue
+            resultados = {}
+            for destino in destinos:
+                try:
+                    resultados[destino] = grafo.dijkstra(
+                        origen, destino, criterio, traza='full')
+                except ValueError as e:
+                    resultados[destino] = {'error': str(e)}
+            por_origen[origen] = resultados
+        return por_origen
+
+    def calcular_matriz(self, datos):
+        """Calcula las matrices de costos entre un subconjunto de ciudades"""
+        try:
+            ciudades = datos.get('ciudades')
+            criterio = datos.get('criterio') or 'ambos'
+            criterios = list(CRITERIOS) if criterio == 'ambos' else [criterio]
+            formato = datos.get('formato') or 'json'
+
+            valido, error = self.vista.validar_datos_matriz(
+                ciudades, criterios, formato)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            matrices = self._matriz_costos(
+                self.obtener_instantanea(), ciudades, criterios)
+            if formato == 'npy':
+                return self.vista.formatear_respuesta_npy(matrices)
+            return self.vista.formatear_respuesta_matriz(matrices)
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def _matriz_costos(self, grafo, ciudades, criterios):
+        """Matrices de costos de 'grafo'. Con muchas búsquedas las filas se
+        reparten por bloques de orígenes en el pool de trabajos, que carga
+        cada versión del grafo una sola vez; dentro de un proceso del pool
+        (async=true) se calculan allí mismo."""
+        ciudades = list(grafo.ciudades) if ciudades is None else ciudades
+        if (en_proceso_trabajador() or self.trabajos.procesos == 1
+                or len(ciudades) * len(criterios) < MIN_BUSQUEDAS_PARALELO):
+            return grafo.matriz_costos(ciudades, criterios)
+
+        tamano = -(-len(ciudades) // self.trabajos.procesos)
+        partes = self.trabajos.repartir(grafo, 'filas_matriz', [
+            {'ciudades': ciudades, 'criterios': criterios,
+             'origenes': ciudades[i:i + tamano]}
+            for i in range(0, len(ciudades), tamano)
+        ])
+        matrices = partes[0]
+        for parte in partes[1:]:
+            for criterio in criterios:
+                matrices[criterio].extend(parte[criterio])
+        return matrices
+
+    def filas_matriz(self, datos):
+        """Filas de las matrices de costos de un bloque de orígenes (lo
+        ejecutan los procesos del pool para _matriz_costos)"""
+        return self.modelo.matriz_costos(
+            datos['ciudades'], datos['criterios'], datos['origenes'])
+
+    def importar_mapa(self, fuentes):
+        """Reemplaza el mapa con los archivos [(archivo de texto, formato)],
+        leídos en orden y por lotes"""
+        try:
+            valido, error = self.vista.validar_formatos_importacion(
+                [formato for _, formato in fuentes])
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            inicio = time.perf_counter()
+            self.modelo.cargar_lotes(
+                lote for archivo, formato in fuentes
+                for lote in leer_lotes(archivo, formato))
+            segundos = time.perf_counter() - inicio
+
+            grafo = self.obtener_instantanea()
+            return self.vista.formatear_respuesta_importacion(
+                len(grafo.ciudades), len(grafo.conexiones) // 2,
+                grafo.version, segundos)
+
+        except UnicodeDecodeError:
+            return self.vista.formatear_error("Los archivos deben estar en UTF-8")
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
     def agregar_ciudad(self, datos):
         """Agrega una nueva ciudad"""
         try:
@@ -85,6 +568,28 @@ class MapaController:
         except Exception as e:
             return self.vista.formatear_error(str(e))
 
+    def asignar_perfil(self, datos):
+        """Asigna a una ruta su perfil de tiempo según la hora de salida"""
+        try:
+            valido, error = self.vista.validar_datos_perfil(datos)
+            if not valido:
+                return self.vista.formatear_error(error)
+
+            self.modelo.asignar_perfil(
+                datos['ciudad1'], datos['ciudad2'], datos['horas'], datos['tiempos'])
+            return self.vista.formatear_exito("Perfil de tiempo asignado correctamente")
+
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
+    def quitar_perfil(self, ciudad1, ciudad2):
+        """Quita el perfil de tiempo de una ruta"""
+        try:
+            self.modelo.quitar_perfil(ciudad1, ciudad2)
+            return self.vista.formatear_exito("Perfil de tiempo eliminado correctamente")
+        except Exception as e:
+            return self.vista.formatear_error(str(e))
+
     def eliminar_ciudad(self, nombre):
         """Elimina una ciudad existente"""
         try:
@@ -0,0 +1,200 @@
+"""
+ARCHIVO: models/arboles_caminos.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Árboles de caminos mínimos completos por origen y su caché.
+             Un solo Dijkstra desde un origen responde cualquier destino
+             posterior solo reconstruyendo el camino con 'previos'. Cuando
+             cambia el peso de una sola ruta los árboles se reparan (estilo
+             Ramalingam-Reps) recorriendo solo la parte afectada.
+DEPENDENCIAS: collections.OrderedDict (orden de uso), threading, heapq, math
+"""
+
+import heapq
+import math
+import threading
+from collections import OrderedDict
+
+# Estimación de memoria por ciudad en un árbol (entradas de dos diccionarios)
+BYTES_POR_ENTRADA = 200
+
+
+class ArbolCaminos:
+    def __init__(self, origen, criterio, distancias, previos):
+        self.origen = origen
+        self.criterio = criterio
+        self.distancias = distancias  # ciudad → costo mínimo desde origen
+        self.previos = previos        # ciudad → ciudad anterior en el camino
+
+    def alcanza(self, destino):
+        """Indica si el destino es alcanzable desde el origen"""
+        return destino in self.distancias
+
+    def camino(self, destino):
+        """Reconstruye el camino origen → destino siguiendo 'previos'"""
+        camino = [destino]
+        while camino[-1] in self.previos:
+            camino.append(self.previos[camino[-1]])
+        camino.reverse()
+        return camino
+
+    def memoria_estimada(self):
+        """Bytes aproximados que ocupa el árbol"""
+        return (len(self.distancias) + len(self.previos)) * BYTES_POR_ENTRADA
+
+
+def reparar_arbol(arbol, adyacencia, ciudad1, ciudad2, anterior, nuevo):
+    """Árbol válido después de que el peso de la ruta ciudad1-ciudad2 pasó
+    de 'anterior' a 'nuevo' (None: la ruta no existía / fue eliminada).
+
+    'adyacencia' ya refleja el cambio. Si el árbol no se ve afectado se
+    retorna el mismo objeto; si no, uno nuevo (el original puede estar en
+    uso por consultas sobre la versión anterior y no se modifica).
+    """
+    if anterior == nuevo or ciudad1 == ciudad2:
+        return arbol
+    criterio = arbol.criterio
+    distancias, previos = arbol.distancias, arbol.previos
+
+    if nuevo is not None and (anterior is None or nuevo < anterior):
+        # Ruta nueva o más corta: solo pueden mejorar las ciudades que pasen
+        # a usarla; se propagan las mejoras desde el extremo que mejora
+        for desde, hacia in ((ciudad1, ciudad2), (ciudad2, ciudad1)):
+            if (desde in distancias
+                    and distancias[desde] + nuevo < distancias.get(hacia, math.inf)):
+                distancias, previos = dict(distancias), dict(previos)
+                distancias[hacia] = distancias[desde] + nuevo
+                previos[hacia] = desde
+                _propagar(adyacencia, criterio, distancias, previos,
+                          [(distancias[hacia], hacia)])
+                return ArbolCaminos(arbol.origen, criterio, distancias, previos)
+        return arbol
+
+    # Ruta más larga o eliminada: solo importa si es una arista del árbol, y
+    # entonces solo cambia el subárbol que cuelga de ella
+    if previos.get(ciudad2) == ciudad1:
+        raiz = ciudad2
+    elif previos.get(ciudad1) == ciudad2:
+        raiz = ciudad1
+    else:
+        return arbol
+
+    # Los hijos de una ciudad son los vecinos cuyo previo es ella
+    afectadas = {raiz}
+    pendientes = [raiz]
+    while pendientes:
+        ciudad = pendientes.pop()
+        for vecino in adyacencia[ciudad]:
+            if previos.get(vecino) == ciudad and vecino not in afectadas:
+                afectadas.add(vecino)
+                pendientes.append(vecino)
+
+    distancias, previos = dict(distancias), dict(previos)
+    for ciudad in afectadas:
+        del distancias[ciudad]
+        del previos[ciudad]
+
+    # Cada ciudad afectada parte del mejor vecino no afectado (frontera);
+    # las no afectadas conservan su costo, que no puede mejorar
+    cola = []
+    for ciudad in afectadas:
+        for vecino, pesos in adyacencia[ciudad].items():
+            if vecino in distancias:
+                costo = distancias[vecino] + pesos.get(criterio, pesos['distancia'])
+                if costo < distancias.get(ciudad, math.inf):
+                    distancias[ciudad] = costo
+                    previos[ciudad] = vecino
+        if ciudad in distancias:
+            cola.append((distancias[ciudad], ciudad))
+
+    _propagar(adyacencia, criterio, distancias, previos, cola)
+    return ArbolCaminos(arbol.origen, criterio, distancias, previos)
+
+
+def _propagar(adyacencia, criterio, distancias, previos, cola):
+    """Dijkstra a partir de costos ya asignados en 'cola' [(costo, ciudad)]"""
+    heapq.heapify(cola)
+    while cola:
+        dist_actual, ciudad_actual = heapq.heappop(cola)
+        if dist_actual > distancias[ciudad_actual]:
+            continue
+        for vecino, pesos_ruta in adyacencia[ciudad_actual].items():
+            nueva_dist = dist_actual + pesos_ruta.get(criterio, pesos_ruta['distancia'])
+            if nueva_dist < distancias.get(vecino, math.inf):
+                distancias[vecino] = nueva_dist
+                previos[vecino] = ciudad_actual
+                heapq.heappush(cola, (nueva_dist, vecino))
+
+
+class CacheArboles:
+    def __init__(self, presupuesto_bytes=64 * 1024 * 1024):
+        self.presupuesto_bytes = presupuesto_bytes
+        self.aciertos = 0
+        self.fallos = 0
+        self.reparaciones = 0
+        self._arboles = OrderedDict()  # (origen, criterio) → ArbolCaminos
+        self._memoria = 0
+        self._version = None
+        self._bloqueo = threading.Lock()
+
+    def obtener(self, origen, criterio, version, construir):
+        """Retorna el árbol de (origen, criterio) o lo construye"""
+        clave = (origen, criterio)
+        with self._bloqueo:
+            # Consulta sobre una instantánea anterior: construir sin cachear
+            anterior = self._version is not None and version < self._version
+            if version != self._version and not anterior:
+                self._arboles.clear()
+                self._memoria = 0
+                self._version = version
+
+            arbol = None if anterior else self._arboles.get(clave)
+            if arbol is not None:
+                self._arboles.move_to_end(clave)
+                self.aciertos += 1
+                return arbol
+            self.fallos += 1
+
+        arbol = construir()
+
+        with self._bloqueo:
+            if version == self._version and clave not in self._arboles:
+                self._arboles[clave] = arbol
+                self._memoria += arbol.memoria_estimada()
+                self._desalojar()
+
+        return arbol
+
+    def migrar(self, version_anterior, version, reparar):
+        """Lleva los árboles de 'version_anterior' a 'version' con
+        reparar(arbol) → árbol, en lugar de descartarlos en la próxima consulta"""
+        with self._bloqueo:
+            if self._version != version_anterior:
+                return
+            for clave, arbol in list(self._arboles.items()):
+                reparado = reparar(arbol)
+                if reparado is not arbol:
+                    self._memoria += reparado.memoria_estimada() - arbol.memoria_estimada()
+                    self._arboles[clave] = reparado
+                    self.reparaciones += 1
+            self._version = version
+            self._desalojar()
+
+    def _desalojar(self):
+        """Elimina los árboles menos usados hasta respetar el presupuesto"""
+        while self._memoria > self.presupuesto_bytes and len(self._arboles) > 1:
+            _, arbol = self._arboles.popitem(last=False)
+            self._memoria -= arbol.memoria_estimada()
+
+    def estadisticas(self):
+        """Retorna ocupación y contadores de la caché de árboles"""
+        with self._bloqueo:
+            return {
+                'arboles': len(self._arboles),
+                'memoria_estimada': self._memoria,
+                'presupuesto_bytes': self.presupuesto_bytes,
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'reparaciones': self.reparaciones,
+                'version': self._version
+            }
@@ -0,0 +1,61 @@
+"""
+ARCHIVO: models/cache_rutas.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Caché LRU acotada de resultados de rutas. Cada entrada pertenece
+             a una versión del grafo: al cambiar la versión se descarta todo.
+DEPENDENCIAS: collections.OrderedDict (orden de uso), threading (acceso
+              concurrente desde el servidor)
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class CacheRutas:
+    def __init__(self, capacidad=256):
+        self.capacidad = capacidad
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas = OrderedDict()
+        self._version = None
+        self._bloqueo = threading.Lock()
+
+    def obtener(self, clave, version, calcular):
+        """Retorna el resultado cacheado o lo calcula con calcular()"""
+        with self._bloqueo:
+            # Consulta sobre una instantánea anterior: calcular sin cachear
+            anterior = self._version is not None and version < self._version
+            if version != self._version and not anterior:
+                self._entradas.clear()
+                self._version = version
+
+            if not anterior and clave in self._entradas:
+                self._entradas.move_to_end(clave)
+                self.aciertos += 1
+                return self._entradas[clave]
+            self.fallos += 1
+
+        # Calcular fuera del bloqueo (los errores no se cachean)
+        resultado = calcular()
+
+        with self._bloqueo:
+            if version == self._version:
+                self._entradas[clave] = resultado
+                if len(self._entradas) > self.capacidad:
+                    self._entradas.popitem(last=False)
+
+        return resultado
+
+    def estadisticas(self):
+        """Retorna contadores de aciertos/fallos para dimensionar la caché"""
+        with self._bloqueo:
+            consultas = self.aciertos + self.fallos
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'tasa_aciertos': self.aciertos / consultas if consultas else 0,
+                'entradas': len(self._entradas),
+                'capacidad': self.capacidad,
+                'version': self._version
+            }
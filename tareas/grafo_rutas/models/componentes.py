@@ -0,0 +1,88 @@
+"""
+ARCHIVO: models/componentes.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Componentes conexas del grafo con unión-búsqueda (union-find).
+             Agregar rutas las actualiza al instante (una ciudad que aún no
+             figura es su propia componente); eliminar
+             una ruta o una ciudad puede partir una componente, así que solo
+             se marca y se reconstruye recién en la siguiente consulta.
+             Permite descartar en O(1) los pares sin camino posible.
+DEPENDENCIAS: ninguna
+"""
+
+
+class ComponentesConexas:
+    def __init__(self):
+        self.padre = {}     # ciudad → ciudad padre (la raíz representa la componente;
+                            # una ciudad ausente es una componente de una sola)
+        self.rango = {}     # raíz → cota de la altura de su árbol (0 si falta)
+        self.valido = True  # False tras eliminar: reconstruir antes de consultar
+
+    def copiar(self):
+        """Copia independiente (copia al escribir del grafo)"""
+        copia = ComponentesConexas()
+        # 'valido' se lee antes que 'padre': una reconstrucción concurrente
+        # asigna primero 'padre' y después 'valido'
+        copia.valido = self.valido
+        copia.padre = dict(self.padre)
+        copia.rango = dict(self.rango)
+        return copia
+
+    def unir(self, ciudad1, ciudad2):
+        """Une las componentes de dos ciudades (nueva ruta entre ellas)"""
+        if not self.valido:
+            return
+        raiz1, raiz2 = self.raiz(ciudad1), self.raiz(ciudad2)
+        if raiz1 == raiz2:
+            return
+        rango1, rango2 = self.rango.get(raiz1, 0), self.rango.get(raiz2, 0)
+        if rango1 < rango2:
+            raiz1, raiz2, rango1, rango2 = raiz2, raiz1, rango2, rango1
+        self.padre[raiz2] = raiz1
+        if rango1 == rango2:
+            self.rango[raiz1] = rango1 + 1
+
+    def unidas(self, ciudad1, ciudad2):
+        """True si unir(ciudad1, ciudad2) no cambiaría nada (ya están en la
+        misma componente, o las componentes esperan reconstruirse)"""
+        return not self.valido or self.raiz(ciudad1) == self.raiz(ciudad2)
+
+    def invalidar(self):
+        """Tras eliminar rutas o ciudades: reconstruir en la próxima consulta"""
+        self.valido = False
+
+    def raiz(self, ciudad):
+        """Representante de la componente de la ciudad (con compresión de caminos)"""
+        padre = self.padre
+        raiz = ciudad
+        while padre.get(raiz, raiz) != raiz:
+            raiz = padre[raiz]
+        while padre.get(ciudad, ciudad) != raiz:
+            padre[ciudad], ciudad = raiz, padre[ciudad]
+        return raiz
+
+    def conectadas(self, adyacencia, ciudad1, ciudad2):
+        """True si hay algún camino entre las dos ciudades"""
+        if not self.valido:
+            self.reconstruir(adyacencia)
+        return self.raiz(ciudad1) == self.raiz(ciudad2)
+
+    def reconstruir(self, adyacencia):
+        """Etiqueta las componentes con un recorrido por ciudad no visitada;
+        cada ciudad apunta directamente a su representante"""
+        padre = {}
+        for inicio in adyacencia:
+            if inicio in padre:
+                continue
+            padre[inicio] = inicio
+            pendientes = [inicio]
+            while pendientes:
+                ciudad = pendientes.pop()
+                for vecino in adyacencia[ciudad]:
+                    if vecino not in padre:
+                        padre[vecino] = inicio
+                        pendientes.append(vecino)
+        self.rango = {ciudad: 1 for ciudad in padre if padre[ciudad] == ciudad}
+        self.padre = padre
+        self.valido = True
@@ -0,0 +1,51 @@
+"""
+ARCHIVO: models/diario_eventos.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Diario acotado de los cambios del grafo (ciudad/ruta agregada o
+             eliminada), cada uno con la versión del grafo que produjo. Los
+             clientes esperan eventos nuevos o piden los posteriores a una
+             versión para ponerse al día sin recargar el mapa completo.
+DEPENDENCIAS: collections, threading
+"""
+
+import threading
+from collections import deque
+
+# Eventos conservados para ponerse al día (los más antiguos se descartan)
+MAX_EVENTOS = 1000
+
+
+class DiarioEventos:
+    def __init__(self, version=0, capacidad=MAX_EVENTOS):
+        self.eventos = deque(maxlen=capacidad)
+        # Versión del último evento y versión anterior al evento más antiguo
+        self.version = version
+        self.base = version
+        self._condicion = threading.Condition()
+
+    def registrar(self, evento):
+        """Agrega un evento ({'tipo', 'version', ...}) y despierta a quienes esperan"""
+        with self._condicion:
+            if len(self.eventos) == self.eventos.maxlen:
+                self.base = self.eventos[0]['version']
+            self.eventos.append(evento)
+            self.version = evento['version']
+            self._condicion.notify_all()
+
+    def desde(self, version):
+        """Eventos posteriores a 'version'; None si el diario ya no los cubre"""
+        with self._condicion:
+            return self._desde(version)
+
+    def esperar(self, version, espera):
+        """Como desde(), pero si no hay eventos nuevos espera hasta 'espera'
+        segundos a que llegue alguno (retorna [] si no llegó ninguno)"""
+        with self._condicion:
+            self._condicion.wait_for(lambda: self.version != version, espera)
+            return self._desde(version)
+
+    def _desde(self, version):
+        if version < self.base or version > self.version:
+            return None
+        return [evento for evento in self.eventos if evento['version'] > version]
@@ -0,0 +1,102 @@
+"""
+ARCHIVO: models/generador_redes.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Generadores de redes viales sintéticas (rejilla con ruido y grafo
+             geométrico aleatorio) con coordenadas y pesos distancia/tiempo.
+             Producen el mismo diccionario que recibe GrafoRutas.cargar_datos.
+DEPENDENCIAS: math, random
+"""
+
+import math
+import random
+
+# Rango de sinuosidad: km de ruta por unidad de distancia en línea recta
+SINUOSIDAD = (1.0, 1.4)
+
+# Rango de velocidades promedio (km/h) para derivar el tiempo
+VELOCIDADES = (30, 90)
+
+
+def generar_rejilla(filas, columnas, separacion=10, ruido=0.3,
+                    prob_ruta=0.9, semilla=None):
+    """Rejilla filas×columnas con coordenadas desplazadas al azar.
+
+    Cada ciudad se une a su vecina derecha e inferior con probabilidad
+    'prob_ruta' (calles cortadas); 'ruido' es el desplazamiento máximo
+    como fracción de la separación.
+    """
+    azar = random.Random(semilla)
+    ciudades = {}
+    for fila in range(filas):
+        for columna in range(columnas):
+            x = (columna + azar.uniform(-ruido, ruido)) * separacion
+            y = (fila + azar.uniform(-ruido, ruido)) * separacion
+            ciudades[_nombre(fila * columnas + columna)] = [
+                round(x + separacion, 2), round(y + separacion, 2)]
+
+    pares = []
+    for fila in range(filas):
+        for columna in range(columnas):
+            indice = fila * columnas + columna
+            if columna + 1 < columnas and azar.random() < prob_ruta:
+                pares.append((indice, indice + 1))
+            if fila + 1 < filas and azar.random() < prob_ruta:
+                pares.append((indice, indice + columnas))
+
+    return _con_pesos(ciudades, pares, azar)
+
+
+def generar_geometrico(n, grado_medio=6, lado=1000, semilla=None):
+    """Grafo geométrico aleatorio: n ciudades uniformes en un cuadrado y
+    rutas entre las que quedan a menos de un radio elegido para lograr
+    'grado_medio' vecinos en promedio. Puede tener ciudades aisladas."""
+    azar = random.Random(semilla)
+    puntos = [(azar.uniform(0, lado), azar.uniform(0, lado)) for _ in range(n)]
+    ciudades = {
+        _nombre(i): [round(x, 2), round(y, 2)] for i, (x, y) in enumerate(puntos)
+    }
+
+    # Cubetas de lado = radio: solo se comparan ciudades de celdas vecinas
+    radio = math.sqrt(grado_medio * lado * lado / (math.pi * max(n, 1)))
+    cubetas = {}
+    for i, (x, y) in enumerate(puntos):
+        cubetas.setdefault((int(x // radio), int(y // radio)), []).append(i)
+
+    pares = []
+    for (cx, cy), indices in cubetas.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+            vecinas = cubetas.get((cx + dx, cy + dy))
+            if not vecinas:
+                continue
+            for i in indices:
+                xi, yi = puntos[i]
+                for j in vecinas:
+                    if (dx, dy) == (0, 0) and j <= i:
+                        continue
+                    if math.hypot(puntos[j][0] - xi, puntos[j][1] - yi) <= radio:
+                        pares.append((i, j))
+
+    return _con_pesos(ciudades, pares, azar)
+
+
+def _nombre(indice):
+    return f"C{indice}"
+
+
+def _con_pesos(ciudades, pares, azar):
+    """Arma el diccionario de cargar_datos con pesos derivados de la
+    longitud en línea recta de cada ruta"""
+    conexiones = []
+    pesos = {}
+    for i, j in pares:
+        ciudad1, ciudad2 = _nombre(i), _nombre(j)
+        (x1, y1), (x2, y2) = ciudades[ciudad1], ciudades[ciudad2]
+        distancia = math.hypot(x2 - x1, y2 - y1) * azar.uniform(*SINUOSIDAD)
+        distancia = round(max(distancia, 0.1), 1)
+        conexiones.append([ciudad1, ciudad2])
+        pesos[f"{ciudad1}-{ciudad2}"] = {
+            'distancia': distancia,
+            'tiempo': round(distancia / azar.uniform(*VELOCIDADES), 3)
+        }
+    return {'ciudades': ciudades, 'conexiones': conexiones, 'pesos': pesos}
@@ -6,35 +6,229 @@ DESCRIPCIÓN: Implementación del grafo de rutas y algoritmo Dijkstra.
              Representa ciudades, conexiones y calcula caminos óptimos.
 DEPENDENCIAS: heapq, Módulo de Python que implementa colas de prioridad 
               usando min-heap para eficiencia.
+              math, para la distancia en línea recta de la heurística A*.
+              models.jerarquia_contraccion, preprocesamiento opcional (CH).
+              models.arboles_caminos, árboles de caminos mínimos por origen.
+              models.componentes, componentes conexas (pares sin camino).
+              models.matriz_costos, matrices de costos entre ciudades.
+              models.orden_paradas, orden óptimo de paradas intermedias.
+              models.traza, traza opcional de la búsqueda.
+              models.rutas_pareto, rutas no dominadas distancia/tiempo.
+              models.rutas_alternativas, k rutas más cortas (Yen).
+              models.indice_espacial, ciudades cercanas y por rectángulo.
+              models.persistencia, instantánea binaria mapeada en memoria.
+              models.perfiles_tiempo, tiempos de viaje según la hora de salida.
+              threading, instantáneas de solo lectura (copia al escribir).
 """
 
 import heapq
+import math
+import threading
+from collections.abc import Mapping
+
+from models.arboles_caminos import ArbolCaminos, CacheArboles, reparar_arbol
+from models.componentes import ComponentesConexas
+from models.indice_espacial import IndiceEspacial, segmento_cruza_rectangulo
+from models.jerarquia_contraccion import CacheJerarquias
+from models.matriz_costos import calcular_matriz
+from models.orden_paradas import ordenar_paradas
+from models.perfiles_tiempo import crear_perfil
+from models.persistencia import MapaBinario, guardar_mapa
+from models.rutas_alternativas import k_rutas_mas_cortas
+from models.rutas_pareto import MAX_ETIQUETAS_POR_CIUDAD, buscar_pareto
+from models.traza import crear_traza, pasos_de
+
+# Algoritmos de búsqueda disponibles en GrafoRutas.dijkstra
+ALGORITMOS = ('dijkstra', 'astar', 'bidireccional', 'ch', 'arbol')
+
+# Nivel de detalle: con zoom z se conserva una ciudad por celda de
+# CELDA_DETALLE / z unidades de mapa (la de más conexiones)
+CELDA_DETALLE = 40
+
+# Contenedores que una instantánea comparte con el grafo hasta que este los
+# modifica (ver _preparar_escritura)
+CONTENEDORES = ('ciudades', 'adyacencia', 'perfiles', 'componentes', 'indice')
+
+
+class VistaConexiones(Mapping):
+    """Conexiones (ciudad1, ciudad2) → pesos en ambos sentidos, leídas de
+    la lista de adyacencia: no se guardan aparte, así que modificar una ruta
+    no obliga a copiar un diccionario con todas las rutas"""
+    __slots__ = ('_adyacencia',)
+
+    def __init__(self, adyacencia):
+        self._adyacencia = adyacencia
+
+    def __getitem__(self, par):
+        ciudad1, ciudad2 = par
+        return self._adyacencia[ciudad1][ciudad2]
+
+    def __contains__(self, par):
+        ciudad1, ciudad2 = par
+        vecinos = self._adyacencia.get(ciudad1)
+        return vecinos is not None and ciudad2 in vecinos
+
+    def __iter__(self):
+        for ciudad1, vecinos in self._adyacencia.items():
+            for ciudad2 in vecinos:
+                yield ciudad1, ciudad2
+
+    def __len__(self):
+        return sum(len(vecinos) for vecinos in self._adyacencia.values())
+
+    def items(self):
+        for ciudad1, vecinos in self._adyacencia.items():
+            for ciudad2, pesos in vecinos.items():
+                yield (ciudad1, ciudad2), pesos
+
+    def copy(self):
+        return dict(self.items())
 
 
 class GrafoRutas:
     def __init__(self, datos_iniciales=None):
         self.ciudades = {}
-        self.conexiones = {}
+        # Lista de adyacencia: ciudad → {vecino: pesos}
+        self.adyacencia = {}
+        # (ciudad1, ciudad2) → pesos, vista sobre la adyacencia
+        self.conexiones = VistaConexiones(self.adyacencia)
+        # Perfiles de tiempo según la hora de salida (opcionales, aparte de
+        # los pesos): (ciudad1, ciudad2) → PerfilTiempo, en ambos sentidos
+        self.perfiles = {}
+        # Componentes conexas: descartan sin búsqueda los pares sin camino
+        self.componentes = ComponentesConexas()
+        # Costo mínimo observado por unidad de mapa (cota admisible de A*)
+        self._costo_por_unidad = {'distancia': math.inf, 'tiempo': math.inf}
+        # Jerarquías de contracción por criterio, válidas para una versión
+        self.jerarquias = CacheJerarquias()
+        # Versión del grafo: aumenta con cada modificación (invalida cachés)
+        self.version = 0
+        # Árboles de caminos mínimos completos por (origen, criterio)
+        self.arboles = CacheArboles()
+        # Rejilla sobre las coordenadas (consultas por cercanía y rectángulo)
+        self.indice = IndiceEspacial()
+        # Ruta más larga observada en línea recta (margen de las vistas)
+        self._longitud_max_ruta = 0
+        # Funciones notificadas con cada cambio (ver suscribir)
+        self._observadores = []
+        # Copia al escribir: las modificaciones se serializan con el candado y
+        # nunca alteran diccionarios ya entregados en una instantánea
+        self._candado = threading.RLock()
+        self._compartidos = set()  # CONTENEDORES aún compartidos
+        self._propias = set()  # Ciudades cuyo dict de vecinos no se comparte
+        self._solo_lectura = False
         if datos_iniciales:
             self.cargar_datos(datos_iniciales)
 
     def cargar_datos(self, datos):
         """Carga datos iniciales en el modelo"""
-        # Limpiar datos existentes
-        self.ciudades = {}
-        self.conexiones = {}
+        pesos = datos.get('pesos', {})
+        rutas = []
+        for ciudad1, ciudad2 in datos.get('conexiones', []):
+            pesos_ruta = pesos.get(f"{ciudad1}-{ciudad2}")
+            if pesos_ruta:
+                rutas.append((ciudad1, ciudad2, pesos_ruta))
+        ciudades = [(ciudad, coordenadas[0], coordenadas[1])
+                    for ciudad, coordenadas in datos.get('ciudades', {}).items()]
+        self.cargar_lotes([('ciudades', ciudades), ('rutas', rutas)])
 
-        # Cargar ciudades
-        for ciudad, coordenadas in datos.get('ciudades', {}).items():
-            self.agregar_ciudad(ciudad, coordenadas[0], coordenadas[1])
+    def cargar_lotes(self, lotes):
+        """Reemplaza el grafo con lotes ('ciudades', [(nombre, x, y)]),
+        ('rutas', [(ciudad1, ciudad2, pesos)]) y opcionalmente ('perfiles',
+        [(ciudad1, ciudad2, PerfilTiempo)]), p. ej. de models.importador o de
+        una instantánea binaria.
 
-        # Cargar rutas
-        for conexion in datos.get('conexiones', []):
-            ciudad1, ciudad2 = conexion
-            clave = f"{ciudad1}-{ciudad2}"
-            pesos = datos['pesos'].get(clave)
-            if pesos:
-                self.agregar_ruta(ciudad1, ciudad2, pesos)
+        Construye los diccionarios nuevos en una sola pasada, sin candado ni
+        eventos por elemento, y los publica al final de una vez: si un lote
+        es inválido se lanza ValueError y el grafo queda como estaba.
+
+        El recolector de ciclos sigue activo durante la carga: pausarlo
+        (gc.disable) afectaría a todos los hilos del servidor y en las
+        mediciones no acortaba la carga de forma apreciable.
+        """
+        self._verificar_escritura()
+        ciudades = {}
+        adyacencia = {}
+        perfiles = {}
+        minimo_distancia = minimo_tiempo = math.inf
+        longitud_max = 0
+
+        for tipo, registros in lotes:
+            if tipo == 'ciudades':
+                for nombre, x, y in registros:
+                    if nombre in ciudades:
+                        raise ValueError(f"La ciudad {nombre} ya existe")
+                    ciudades[nombre] = (x, y)
+                    adyacencia[nombre] = {}
+                continue
+            if tipo == 'perfiles':
+                for ciudad1, ciudad2, perfil in registros:
+                    if ciudad2 not in adyacencia.get(ciudad1, ()):
+                        raise ValueError(
+                            f"Perfil {ciudad1}-{ciudad2}: la ruta no existe")
+                    perfiles[(ciudad1, ciudad2)] = perfil
+                    perfiles[(ciudad2, ciudad1)] = perfil
+                continue
+
+            for ciudad1, ciudad2, pesos in registros:
+                try:
+                    x1, y1 = ciudades[ciudad1]
+                    x2, y2 = ciudades[ciudad2]
+                except KeyError:
+                    raise ValueError(
+                        f"Ruta {ciudad1}-{ciudad2}: una o ambas ciudades no existen")
+                adyacencia[ciudad1][ciudad2] = pesos
+                adyacencia[ciudad2][ciudad1] = pesos
+
+                # Igual que _actualizar_cota_heuristica, sobre los datos nuevos
+                longitud = math.hypot(x2 - x1, y2 - y1)
+                if longitud > longitud_max:
+                    longitud_max = longitud
+                if longitud:
+                    distancia = pesos['distancia']
+                    if distancia / longitud < minimo_distancia:
+                        minimo_distancia = distancia / longitud
+                    tiempo = pesos.get('tiempo', distancia)
+                    if tiempo / longitud < minimo_tiempo:
+                        minimo_tiempo = tiempo / longitud
+
+        # Tamaño de celda según la densidad de las ciudades cargadas
+        indice = IndiceEspacial(IndiceEspacial.tam_sugerido(ciudades.values()))
+        indice.insertar_varias(ciudades)
+        componentes = ComponentesConexas()
+        componentes.reconstruir(adyacencia)
+
+        with self._candado:
+            self._verificar_escritura()
+            # Diccionarios nuevos, no compartidos con ninguna instantánea
+            self.ciudades = ciudades
+            self.adyacencia = adyacencia
+            self.conexiones = VistaConexiones(adyacencia)
+            self.perfiles = perfiles
+            self.indice = indice
+            self.componentes = componentes
+            self._costo_por_unidad = {'distancia': minimo_distancia,
+                                      'tiempo': minimo_tiempo}
+            self._longitud_max_ruta = longitud_max
+            self._compartidos = set()
+            self._propias = set(adyacencia)
+            self._registrar_cambio()
+            # Un solo evento para toda la carga, no uno por elemento
+            self._notificar('mapa_cargado')
+
+    def guardar_binario(self, ruta):
+        """Guarda la versión actual en una instantánea binaria (persistencia)"""
+        guardar_mapa(self.instantanea(), ruta)
+
+    def cargar_binario(self, ruta):
+        """Reemplaza el grafo con una instantánea binaria guardada antes.
+
+        Los arreglos se leen del archivo mapeado en memoria, sin analizar
+        texto, pero se copian a los diccionarios de búsqueda (cargar_lotes):
+        la carga es O(V+E) y el mapeo se cierra al terminar.
+        """
+        with MapaBinario(ruta) as mapa:
+            self.cargar_lotes(mapa.lotes())
 
     @classmethod
     def crear_grafo_bolivia(cls):
@@ -98,58 +292,273 @@ class GrafoRutas:
 
     def agregar_ciudad(self, nombre, x, y):
         """Agrega una ciudad al grafo"""
-        if nombre in self.ciudades:
-            raise ValueError(f"La ciudad {nombre} ya existe")
-        self.ciudades[nombre] = (x, y)
-        return True
+        with self._candado:
+            self._verificar_escritura()
+            if nombre in self.ciudades:
+                raise ValueError(f"La ciudad {nombre} ya existe")
+            self._preparar_escritura('ciudades', 'adyacencia', 'indice')
+            self.ciudades[nombre] = (x, y)
+            self.adyacencia[nombre] = {}
+            self._propias.add(nombre)
+            self.indice.insertar(nombre, x, y)
+            # Las componentes no cambian: una ciudad que no figura en ellas
+            # es su propia componente
+            # Una ciudad aislada no altera las jerarquías ni los árboles
+            self._avanzar_version()
+            self._notificar('ciudad_agregada', nombre=nombre, x=x, y=y)
+            return True
 
     def eliminar_ciudad(self, nombre):
         """Elimina una ciudad y sus conexiones"""
-        if nombre not in self.ciudades:
-            raise ValueError(f"La ciudad {nombre} no existe")
+        with self._candado:
+            self._verificar_escritura()
+            if nombre not in self.ciudades:
+                raise ValueError(f"La ciudad {nombre} no existe")
+            self._preparar_escritura('ciudades', 'adyacencia', 'indice')
 
-        # Eliminar ciudad
-        del self.ciudades[nombre]
+            # Eliminar ciudad
+            del self.ciudades[nombre]
+            self.indice.eliminar(nombre)
+            self._invalidar_componentes()
+            self._registrar_cambio()
 
-        # Eliminar conexiones relacionadas
-        conexiones_a_eliminar = [
-            (c1, c2) for c1, c2 in self.conexiones.keys()
-            if c1 == nombre or c2 == nombre
-        ]
+            # Eliminar solo las conexiones incidentes (lista de adyacencia)
+            self._propias.discard(nombre)
+            for vecino in self.adyacencia.pop(nombre):
+                if vecino != nombre:
+                    del self._vecinos_editables(vecino)[nombre]
+                self._quitar_perfil_ruta(nombre, vecino)
 
-        for conexion in conexiones_a_eliminar:
-            del self.conexiones[conexion]
-
-        return True
+            self._notificar('ciudad_eliminada', nombre=nombre)
+            return True
 
     def agregar_ruta(self, ciudad1, ciudad2, peso):
         """Agrega una ruta entre dos ciudades"""
-        if ciudad1 not in self.ciudades or ciudad2 not in self.ciudades:
-            raise ValueError("Una o ambas ciudades no existen")
-
-        # ✅ SI RECIBE UN NÚMERO, CALCULAR TIEMPO AUTOMÁTICAMENTE
-        if isinstance(peso, (int, float)):
-            # Calcular tiempo estimado basado en distancia (60 km/h promedio)
-            tiempo_estimado = round(peso / 60, 1)
-            pesos = {
-                'distancia': peso,
-                'tiempo': tiempo_estimado
-            }
-        else:
-            pesos = peso
+        with self._candado:
+            self._verificar_escritura()
+            if ciudad1 not in self.ciudades or ciudad2 not in self.ciudades:
+                raise ValueError("Una o ambas ciudades no existen")
+            self._preparar_escritura('adyacencia')
 
-        self.conexiones[(ciudad1, ciudad2)] = pesos
-        self.conexiones[(ciudad2, ciudad1)] = pesos
-        return True
+            # ✅ SI RECIBE UN NÚMERO, CALCULAR TIEMPO AUTOMÁTICAMENTE
+            if isinstance(peso, (int, float)):
+                # Calcular tiempo estimado basado en distancia (60 km/h promedio)
+                tiempo_estimado = round(peso / 60, 1)
+                pesos = {
+                    'distancia': peso,
+                    'tiempo': tiempo_estimado
+                }
+            else:
+                pesos = peso
+
+            anteriores = self.adyacencia[ciudad1].get(ciudad2)
+            self._vecinos_editables(ciudad1)[ciudad2] = pesos
+            self._vecinos_editables(ciudad2)[ciudad1] = pesos
+            self._actualizar_cota_heuristica(ciudad1, ciudad2, pesos)
+            # Actualizar una ruta existente (p. ej. por tráfico) no une nada:
+            # solo se copian las componentes si cambian
+            if not self.componentes.unidas(ciudad1, ciudad2):
+                self._preparar_escritura('componentes')
+                self.componentes.unir(ciudad1, ciudad2)
+            self._registrar_cambio()
+            self._reparar_arboles(ciudad1, ciudad2, anteriores, pesos)
+            self._notificar('ruta_agregada', ciudad1=ciudad1, ciudad2=ciudad2,
+                            pesos=pesos)
+            return True
+
+    def instantanea(self):
+        """Vista de solo lectura del grafo en su versión actual.
+
+        Comparte los diccionarios vigentes sin copiarlos; las modificaciones
+        posteriores los copian antes de escribir (_preparar_escritura), así
+        una consulta que use la instantánea ve siempre un estado completo y
+        coherente sin bloquear a los demás hilos.
+        """
+        with self._candado:
+            self._compartidos = set(CONTENEDORES)
+            copia = object.__new__(GrafoRutas)
+            copia.__dict__.update(self.__dict__)
+            copia._solo_lectura = True
+            return copia
+
+    def __getstate__(self):
+        """Estado serializable (pickle): sin candado, observadores ni
+        estructuras derivadas, que se reconstruyen al deserializar"""
+        estado = self.__dict__.copy()
+        for campo in ('_candado', '_observadores', 'arboles', 'jerarquias',
+                      '_propias', '_compartidos'):
+            del estado[campo]
+        return estado
+
+    def __setstate__(self, estado):
+        self.__dict__.update(estado)
+        self._candado = threading.RLock()
+        self._observadores = []
+        self.arboles = CacheArboles()
+        self.jerarquias = CacheJerarquias()
+        # Los diccionarios deserializados no se comparten con nadie
+        self._compartidos = set()
+        self._propias = set(self.adyacencia)
+
+    def _verificar_escritura(self):
+        if self._solo_lectura:
+            raise RuntimeError("La instantánea del grafo es de solo lectura")
+
+    def _preparar_escritura(self, *contenedores):
+        """Copia, de los contenedores que la modificación va a escribir
+        (nombres de CONTENEDORES), los que comparte con alguna instantánea.
+
+        La copia es superficial y solo de lo que se toca: los diccionarios
+        de vecinos y las celdas del índice se copian recién al modificarse,
+        y las conexiones son una vista de la adyacencia. Lo que queda es
+        copiar los punteros del diccionario de nivel superior: O(ciudades)
+        para la adyacencia en la primera ruta modificada tras una
+        instantánea, y además ciudades e índice al agregar o eliminar una
+        ciudad.
+        """
+        self._verificar_escritura()
+        for nombre in contenedores:
+            if nombre not in self._compartidos:
+                continue
+            self._compartidos.discard(nombre)
+            if nombre == 'adyacencia':
+                self.adyacencia = dict(self.adyacencia)
+                self.conexiones = VistaConexiones(self.adyacencia)
+                self._propias = set()
+            elif nombre in ('componentes', 'indice'):
+                setattr(self, nombre, getattr(self, nombre).copiar())
+            else:
+                setattr(self, nombre, dict(getattr(self, nombre)))
+
+    def _invalidar_componentes(self):
+        """Marca las componentes para reconstruir; si están compartidas no
+        se copian: se reemplazan por unas vacías ya invalidadas"""
+        if 'componentes' in self._compartidos:
+            self._compartidos.discard('componentes')
+            self.componentes = ComponentesConexas()
+        self.componentes.invalidar()
+
+    def _quitar_perfil_ruta(self, ciudad1, ciudad2):
+        """Quita el perfil de la ruta si tiene uno (copiando perfiles solo
+        en ese caso)"""
+        if (ciudad1, ciudad2) in self.perfiles:
+            self._preparar_escritura('perfiles')
+            del self.perfiles[(ciudad1, ciudad2)]
+            self.perfiles.pop((ciudad2, ciudad1), None)
+
+    def _vecinos_editables(self, ciudad):
+        """Diccionario de vecinos de la ciudad, copiado si está compartido"""
+        if ciudad not in self._propias:
+            self.adyacencia[ciudad] = dict(self.adyacencia[ciudad])
+            self._propias.add(ciudad)
+        return self.adyacencia[ciudad]
+
+    def _registrar_cambio(self):
+        """Aumenta la versión: las estructuras derivadas de las rutas
+        (árboles, jerarquías) se validan contra ella"""
+        self.version += 1
+
+    def _avanzar_version(self):
+        """Aumenta la versión por un cambio que no altera los pesos de las
+        rutas: las jerarquías y los árboles cacheados siguen siendo válidos"""
+        self.version += 1
+        self.arboles.migrar(self.version - 1, self.version, lambda arbol: arbol)
+        self.jerarquias.migrar(self.version - 1, self.version)
+
+    def _reparar_arboles(self, ciudad1, ciudad2, anteriores, nuevos):
+        """Tras cambiar una sola ruta (pesos anteriores → nuevos, None si no
+        existe) repara los árboles cacheados de la versión anterior en vez de
+        descartarlos: solo se recorre la parte afectada de cada árbol."""
+        def reparar(arbol):
+            criterio = arbol.criterio
+            anterior = (None if anteriores is None
+                        else anteriores.get(criterio, anteriores['distancia']))
+            nuevo = None if nuevos is None else nuevos.get(criterio, nuevos['distancia'])
+            return reparar_arbol(arbol, self.adyacencia, ciudad1, ciudad2,
+                                 anterior, nuevo)
+
+        self.arboles.migrar(self.version - 1, self.version, reparar)
+
+    def suscribir(self, observador):
+        """Registra una función que recibe cada cambio del grafo como
+        {'tipo', 'version', ...datos del cambio}"""
+        self._observadores.append(observador)
+
+    def _notificar(self, tipo, **datos):
+        """Envía un cambio a los observadores"""
+        evento = {'tipo': tipo, 'version': self.version, **datos}
+        for observador in self._observadores:
+            observador(evento)
+
+    def _actualizar_cota_heuristica(self, ciudad1, ciudad2, pesos):
+        """Actualiza el costo mínimo por unidad de distancia en línea recta.
+
+        Para 'distancia' es la menor razón km/unidad observada y para
+        'tiempo' el inverso de la velocidad máxima (unidades/hora). Al
+        eliminar rutas la cota no se recalcula: un valor menor sigue siendo
+        admisible para A*.
+        """
+        x1, y1 = self.ciudades[ciudad1]
+        x2, y2 = self.ciudades[ciudad2]
+        longitud = math.hypot(x2 - x1, y2 - y1)
+        self._longitud_max_ruta = max(self._longitud_max_ruta, longitud)
+        if longitud == 0:
+            return
+
+        for criterio, costo_actual in self._costo_por_unidad.items():
+            costo = pesos.get(criterio, pesos['distancia']) / longitud
+            if costo < costo_actual:
+                # Diccionario nuevo: el anterior puede estar en una instantánea
+                self._costo_por_unidad = {**self._costo_por_unidad, criterio: costo}
 
     def eliminar_ruta(self, ciudad1, ciudad2):
         """Elimina una ruta entre dos ciudades"""
-        if (ciudad1, ciudad2) not in self.conexiones:
-            raise ValueError("La ruta no existe")
+        with self._candado:
+            self._verificar_escritura()
+            if (ciudad1, ciudad2) not in self.conexiones:
+                raise ValueError("La ruta no existe")
+            self._preparar_escritura('adyacencia')
 
-        del self.conexiones[(ciudad1, ciudad2)]
-        del self.conexiones[(ciudad2, ciudad1)]
-        return True
+            anteriores = self.adyacencia[ciudad1][ciudad2]
+            del self._vecinos_editables(ciudad1)[ciudad2]
+            if ciudad2 != ciudad1:
+                del self._vecinos_editables(ciudad2)[ciudad1]
+            self._quitar_perfil_ruta(ciudad1, ciudad2)
+            self._invalidar_componentes()
+            self._registrar_cambio()
+            self._reparar_arboles(ciudad1, ciudad2, anteriores, None)
+            self._notificar('ruta_eliminada', ciudad1=ciudad1, ciudad2=ciudad2)
+            return True
+
+    def asignar_perfil(self, ciudad1, ciudad2, horas, tiempos):
+        """Asigna a la ruta un perfil de tiempo según la hora de salida
+        (puntos horas/tiempos, ver models.perfiles_tiempo).
+
+        Solo lo usan las búsquedas con hora de salida; 'tiempo' en los
+        pesos sigue siendo el valor fijo del resto de los algoritmos.
+        """
+        perfil = crear_perfil(horas, tiempos)
+        with self._candado:
+            self._verificar_escritura()
+            if (ciudad1, ciudad2) not in self.conexiones:
+                raise ValueError("La ruta no existe")
+            self._preparar_escritura('perfiles')
+            self.perfiles[(ciudad1, ciudad2)] = perfil
+            self.perfiles[(ciudad2, ciudad1)] = perfil
+            self._avanzar_version()
+            self._notificar('perfil_asignado', ciudad1=ciudad1, ciudad2=ciudad2)
+            return True
+
+    def quitar_perfil(self, ciudad1, ciudad2):
+        """Quita el perfil de tiempo de la ruta (vuelve al tiempo fijo)"""
+        with self._candado:
+            self._verificar_escritura()
+            if (ciudad1, ciudad2) not in self.perfiles:
+                raise ValueError("La ruta no tiene perfil de tiempo")
+            self._quitar_perfil_ruta(ciudad1, ciudad2)
+            self._avanzar_version()
+            self._notificar('perfil_eliminado', ciudad1=ciudad1, ciudad2=ciudad2)
+            return True
 
     def obtener_ciudades(self):
         """Retorna todas las ciudades"""
@@ -159,21 +568,457 @@ class GrafoRutas:
         """Retorna todas las conexiones"""
         return self.conexiones.copy()
 
-    def dijkstra(self, origen, destino, criterio='distancia'):
+    def dijkstra(self, origen, destino, criterio='distancia', algoritmo='dijkstra',
+                 traza='none', salida=None):
+        """Calcula el camino mínimo con el algoritmo indicado (ver ALGORITMOS).
+
+        'traza' es un modo de MODOS_TRAZA o un objeto con append() que
+        recibe los pasos a medida que se generan (ver models/traza.py).
+        Con 'salida' (hora, p. ej. 7.5 = 07:30) el tiempo de cada ruta sale
+        de su perfil a la hora en que se llega a ella (solo criterio
+        'tiempo' y algoritmo 'dijkstra'); el resultado incluye la llegada.
+        """
+        if origen not in self.ciudades or destino not in self.ciudades:
+            raise ValueError("Origen o destino no existen")
+
+        # Componentes distintas: no hay camino y no hace falta buscarlo
+        if not self.hay_camino(origen, destino):
+            raise ValueError(f"No hay camino de {origen} a {destino}")
+
+        pasos = crear_traza(traza) if isinstance(traza, str) else traza
+        if salida is None:
+            resultado = self._resolver(origen, destino, criterio, algoritmo, pasos)
+        elif criterio != 'tiempo' or algoritmo != 'dijkstra':
+            raise ValueError(
+                "La hora de salida requiere criterio 'tiempo' y algoritmo 'dijkstra'")
+        else:
+            resultado = self._busqueda_dependiente(origen, destino, salida, pasos)
+        resultado['pasos'] = pasos_de(pasos)
+        return resultado
+
+    def hay_camino(self, origen, destino):
+        """True si origen y destino están en la misma componente conexa"""
+        return self.componentes.conectadas(self.adyacencia, origen, destino)
+
+    def _resolver(self, origen, destino, criterio, algoritmo, pasos):
+        """Despacha al algoritmo elegido; retorna camino y distancia"""
+        if algoritmo == 'dijkstra':
+            return self._busqueda(origen, destino, criterio, None, pasos)
+        if algoritmo == 'astar':
+            heuristica = self._heuristica(destino, criterio)
+            return self._busqueda(origen, destino, criterio, heuristica, pasos)
+        if algoritmo == 'bidireccional':
+            return self._busqueda_bidireccional(origen, destino, criterio, pasos)
+        if algoritmo == 'ch':
+            jerarquia = self._jerarquia(criterio)
+            if jerarquia is None:
+                # Jerarquía vieja o en construcción: la búsqueda bidireccional
+                # da el mismo costo sin esperar el preprocesamiento
+                return self._busqueda_bidireccional(origen, destino, criterio, pasos)
+            resultado = jerarquia.consultar(origen, destino, pasos)
+            if resultado is None:
+                raise ValueError(f"No hay camino de {origen} a {destino}")
+            return resultado
+        if algoritmo == 'arbol':
+            # Sin búsqueda (ni traza): el árbol cacheado responde por
+            # reconstrucción
+            arbol = self.arbol_caminos(origen, criterio)
+            if not arbol.alcanza(destino):
+                raise ValueError(f"No hay camino de {origen} a {destino}")
+            return {
+                'camino': arbol.camino(destino),
+                'distancia': arbol.distancias[destino]
+            }
+        raise ValueError(f"Algoritmo {algoritmo} no soportado")
+
+    def arbol_caminos(self, origen, criterio='distancia'):
+        """Retorna el árbol completo de caminos mínimos desde origen.
+
+        Se calcula una vez por (origen, criterio) y versión del grafo; la
+        caché descarta los árboles menos usados según su presupuesto.
+        """
+        if origen not in self.ciudades:
+            raise ValueError(f"La ciudad {origen} no existe")
+
+        def construir():
+            distancias, previos = self._expandir(origen, criterio)
+            return ArbolCaminos(origen, criterio, distancias, previos)
+
+        return self.arboles.obtener(origen, criterio, self.version, construir)
+
+    def rutas_desde(self, origen, destinos, criterio='distancia'):
+        """Calcula las rutas de un origen a varios destinos (sin pasos).
+
+        Con un solo destino la búsqueda se detiene al alcanzarlo; con varios
+        se reutiliza el árbol completo de caminos mínimos del origen. Retorna
+        {destino: {'camino', 'distancia'}} o {destino: {'error'}}.
+        """
+        if origen not in self.ciudades:
+            return {d: {'error': "Origen o destino no existen"} for d in destinos}
+
+        destinos_validos = {d for d in destinos
+                            if d in self.ciudades and self.hay_camino(origen, d)}
+        distancias, previos = {}, {}
+        if len(destinos_validos) == 1:
+            distancias, previos = self._expandir(
+                origen, criterio, next(iter(destinos_validos)))
+        elif destinos_validos:
+            arbol = self.arbol_caminos(origen, criterio)
+            distancias, previos = arbol.distancias, arbol.previos
+
+        resultados = {}
+        for destino in destinos:
+            if destino not in self.ciudades:
+                resultados[destino] = {'error': "Origen o destino no existen"}
+            elif destino not in previos and destino != origen:
+                resultados[destino] = {
+                    'error': f"No hay camino de {origen} a {destino}"}
+            else:
+                resultados[destino] = {
+                    'camino': self._reconstruir_camino(previos, origen, destino),
+                    'distancia': distancias[destino]
+                }
+        return resultados
+
+    def ruta_con_paradas(self, origen, destino, paradas, criterio='distancia',
+                         optimizar=False):
+        """Ruta origen → paradas → destino, opcionalmente reordenando paradas.
+
+        Usa un árbol de caminos mínimos por origen y parada (k+1 búsquedas
+        uno-a-todos); como las rutas son simétricas, esos árboles también
+        dan el costo hacia el destino. Retorna camino, distancia y el orden
+        de visita de las paradas.
+        """
+        puntos = [origen] + list(paradas) + [destino]
+        faltantes = [c for c in puntos if c not in self.ciudades]
+        if faltantes:
+            raise ValueError(f"Ciudades inexistentes: {', '.join(faltantes)}")
+
+        arboles = [self.arbol_caminos(p, criterio) for p in puntos[:-1]]
+        costos = [
+            [arbol.distancias.get(p, math.inf) for p in puntos]
+            for arbol in arboles
+        ]
+        # Fila del destino por simetría
+        costos.append([fila[-1] for fila in costos] + [0])
+
+        if optimizar:
+            orden = ordenar_paradas(costos)
+        else:
+            orden = list(range(1, len(paradas) + 1))
+
+        secuencia = [0] + orden + [len(puntos) - 1]
+        camino = [origen]
+        total = 0
+        for a, b in zip(secuencia, secuencia[1:]):
+            if costos[a][b] == math.inf:
+                raise ValueError(
+                    f"No hay camino de {puntos[a]} a {puntos[b]}")
+            camino.extend(arboles[a].camino(puntos[b])[1:])
+            total += costos[a][b]
+
+        return {
+            'camino': camino,
+            'distancia': total,
+            'orden': [puntos[i] for i in orden],
+            'pasos': []
+        }
+
+    def rutas_pareto(self, origen, destino,
+                     max_etiquetas=MAX_ETIQUETAS_POR_CIUDAD):
+        """Rutas no dominadas en (distancia, tiempo), ordenadas por distancia.
+
+        Retorna {'rutas': [...], 'acotado': bool}; 'acotado' indica que el
+        límite de etiquetas por ciudad pudo omitir alguna ruta del frente.
+        """
+        if origen not in self.ciudades or destino not in self.ciudades:
+            raise ValueError("Origen o destino no existen")
+
+        rutas, acotado = buscar_pareto(
+            self.adyacencia, origen, destino, max_etiquetas)
+        if not rutas:
+            raise ValueError(f"No hay camino de {origen} a {destino}")
+        return {'rutas': rutas, 'acotado': acotado}
+
+    def rutas_alternativas(self, origen, destino, k=3, criterio='distancia'):
+        """Las k rutas más cortas sin ciclos (Yen), sin modificar el grafo.
+
+        Todas las búsquedas de desvío reutilizan el árbol de caminos
+        mínimos con raíz en el destino (cacheado en self.arboles).
+        """
         if origen not in self.ciudades or destino not in self.ciudades:
             raise ValueError("Origen o destino no existen")
 
-        # Inicialización
-        distancias = {ciudad: float('inf') for ciudad in self.ciudades}
-        distancias[origen] = 0
+        arbol_destino = self.arbol_caminos(destino, criterio)
+        rutas = k_rutas_mas_cortas(
+            self.adyacencia, arbol_destino, origen, destino, k, criterio)
+        if not rutas:
+            raise ValueError(f"No hay camino de {origen} a {destino}")
+        return rutas
+
+    def alcance(self, origen, presupuesto, criterio='distancia'):
+        """Ciudades alcanzables desde origen sin superar el presupuesto.
+
+        Dijkstra acotado: solo recorre el subgrafo alcanzable dentro del
+        presupuesto. Retorna [{'ciudad', 'costo', 'previo'}] ordenado por
+        costo; 'previo' permite dibujar el árbol de alcance.
+        """
+        if origen not in self.ciudades:
+            raise ValueError(f"La ciudad {origen} no existe")
+        if presupuesto < 0:
+            raise ValueError("El presupuesto debe ser positivo")
+
+        distancias, previos = self._expandir(
+            origen, criterio, presupuesto=presupuesto)
+        return [
+            {'ciudad': ciudad, 'costo': costo, 'previo': previos.get(ciudad)}
+            for ciudad, costo in sorted(distancias.items(), key=lambda x: x[1])
+        ]
+
+    def ciudades_cercanas(self, x, y, k=1):
+        """Las k ciudades más cercanas al punto (x, y), en línea recta.
+
+        Retorna [{'nombre', 'x', 'y', 'distancia'}] ordenado por distancia.
+        """
+        if k < 1:
+            raise ValueError("k debe ser al menos 1")
+        return [
+            {'nombre': nombre, 'x': px, 'y': py, 'distancia': distancia}
+            for distancia, nombre, (px, py) in self.indice.cercanas(x, y, k)
+        ]
+
+    def ciudades_en_rectangulo(self, xmin, ymin, xmax, ymax):
+        """Ciudades con coordenadas dentro del rectángulo (bordes incluidos)"""
+        if xmin > xmax or ymin > ymax:
+            raise ValueError("Rectángulo inválido: el mínimo supera al máximo")
+        return self.indice.en_rectangulo(xmin, ymin, xmax, ymax)
+
+    def estado_en_vista(self, xmin, ymin, xmax, ymax, zoom=None):
+        """Estado del mapa limitado a un rectángulo de vista.
+
+        Incluye las ciudades dentro de la vista y las rutas cuyo segmento la
+        cruza (con sus extremos, aunque queden fuera). Con 'zoom' la red se
+        simplifica (ver _simplificar_vista). Mismo formato que obtener_estado.
+        """
+        if xmin > xmax or ymin > ymax:
+            raise ValueError("Rectángulo inválido: el mínimo supera al máximo")
+        if zoom is not None and zoom <= 0:
+            raise ValueError("El zoom debe ser positivo")
+
+        # Una ruta que cruza la vista tiene ambos extremos a menos de su
+        # longitud del rectángulo: basta buscar en la vista ampliada
+        margen = self._longitud_max_ruta
+        candidatas = self.indice.en_rectangulo(
+            xmin - margen, ymin - margen, xmax + margen, ymax + margen)
+        ciudades = {
+            nombre: (x, y) for nombre, (x, y) in candidatas.items()
+            if xmin <= x <= xmax and ymin <= y <= ymax
+        }
+
+        rutas = []  # (ciudad1, ciudad2, pesos)
+        for ciudad1, (x1, y1) in candidatas.items():
+            visible = ciudad1 in ciudades
+            for ciudad2, pesos in self.adyacencia[ciudad1].items():
+                if visible or ciudad2 in ciudades:
+                    rutas.append((ciudad1, ciudad2, pesos))
+                elif ciudad2 in candidatas:
+                    x2, y2 = candidatas[ciudad2]
+                    if segmento_cruza_rectangulo(
+                            x1, y1, x2, y2, xmin, ymin, xmax, ymax):
+                        rutas.append((ciudad1, ciudad2, pesos))
+
+        for ciudad1, _, _ in rutas:
+            if ciudad1 not in ciudades:
+                ciudades[ciudad1] = candidatas[ciudad1]
+
+        if zoom is not None:
+            ciudades, rutas = self._simplificar_vista(
+                ciudades, rutas, CELDA_DETALLE / zoom)
+
+        return {
+            'ciudades': ciudades,
+            'conexiones': [[ciudad1, ciudad2] for ciudad1, ciudad2, _ in rutas],
+            'pesos': {f"{ciudad1}-{ciudad2}": pesos
+                      for ciudad1, ciudad2, pesos in rutas}
+        }
+
+    def _simplificar_vista(self, ciudades, rutas, tam):
+        """Nivel de detalle: una ciudad principal por celda de 'tam' unidades.
+
+        La principal es la de más conexiones. Cada ruta entre celdas
+        distintas se redirige a sus principales: si estas tienen ruta directa
+        se usan sus pesos; si no, los de la ruta de menor distancia entre
+        ambas celdas, marcados con 'agregada': True.
+        """
+        celda_de = {
+            nombre: (math.floor(x / tam), math.floor(y / tam))
+            for nombre, (x, y) in ciudades.items()
+        }
+        principal = {}
+        for nombre, celda in celda_de.items():
+            actual = principal.get(celda)
+            if actual is None or (-len(self.adyacencia[nombre]), nombre) < \
+                    (-len(self.adyacencia[actual]), actual):
+                principal[celda] = nombre
+
+        simplificadas = {}  # (principal1, principal2) → pesos
+        for ciudad1, ciudad2, pesos in rutas:
+            par = (principal[celda_de[ciudad1]], principal[celda_de[ciudad2]])
+            if par[0] == par[1]:
+                continue
+            actual = simplificadas.get(par)
+            if actual is not None and (
+                    'agregada' not in actual
+                    or actual['distancia'] <= pesos['distancia']):
+                continue
+            directa = self.adyacencia[par[0]].get(par[1])
+            simplificadas[par] = directa if directa is not None \
+                else {**pesos, 'agregada': True}
+
+        return (
+            {nombre: ciudades[nombre] for nombre in principal.values()},
+            [(ciudad1, ciudad2, pesos)
+             for (ciudad1, ciudad2), pesos in simplificadas.items()]
+        )
+
+    def matriz_costos(self, ciudades=None, criterios=('distancia', 'tiempo'),
+                      origenes=None):
+        """Calcula las matrices N×N de costos entre las ciudades indicadas.
+
+        Ejecuta en este proceso una búsqueda uno-a-todos por ciudad fuente y
+        criterio; con 'origenes' solo las filas de esas ciudades (un bloque
+        de la matriz). Los pares sin camino valen inf.
+        """
+        ciudades = list(self.ciudades) if ciudades is None else list(ciudades)
+        faltantes = [c for c in ciudades if c not in self.ciudades]
+        if faltantes:
+            raise ValueError(f"Ciudades inexistentes: {', '.join(faltantes)}")
+
+        matrices = calcular_matriz(
+            self.adyacencia, ciudades, list(criterios), origenes)
+        return {'ciudades': ciudades, 'criterios': list(criterios), **matrices}
+
+    def preprocesar_jerarquias(self, criterios=('distancia', 'tiempo')):
+        """Construye (esperando) la jerarquía de contracción de cada criterio
+        para la versión actual"""
+        instantanea = self._instantanea_fija()
+        for criterio in criterios:
+            self.jerarquias.construir(criterio, instantanea.version,
+                                      instantanea.adyacencia)
+        return True
+
+    def _jerarquia(self, criterio):
+        """Retorna la jerarquía del criterio para la versión actual, o None
+        si aún no existe; en ese caso lanza su construcción en segundo plano
+        (una sola por criterio)"""
+        jerarquia = self.jerarquias.obtener(criterio, self.version)
+        if jerarquia is None:
+            instantanea = self._instantanea_fija()
+            self.jerarquias.construir_en_segundo_plano(
+                criterio, instantanea.version, instantanea.adyacencia)
+        return jerarquia
+
+    def _instantanea_fija(self):
+        """El grafo mismo si ya es una instantánea; si no, una nueva (su
+        adyacencia no cambia aunque se sigan modificando rutas)"""
+        return self if self._solo_lectura else self.instantanea()
+
+    def _heuristica(self, destino, criterio):
+        """Cota inferior geométrica del costo restante hasta el destino"""
+        costo_por_unidad = self._costo_por_unidad.get(
+            criterio, self._costo_por_unidad['distancia'])
+        if costo_por_unidad == math.inf:  # Sin rutas con longitud: Dijkstra
+            costo_por_unidad = 0
+        xd, yd = self.ciudades[destino]
+
+        def heuristica(ciudad):
+            x, y = self.ciudades[ciudad]
+            return costo_por_unidad * math.hypot(xd - x, yd - y)
+
+        return heuristica
+
+    def _busqueda(self, origen, destino, criterio, heuristica=None, pasos=None):
+        """Dijkstra (sin heurística) o A* (con heurística consistente)"""
+        distancias, previos = self._expandir(
+            origen, criterio, destino, heuristica, pasos)
+
+        # Verificar si hay camino
+        if destino not in previos and origen != destino:
+            raise ValueError(f"No hay camino de {origen} a {destino}")
+
+        # Reconstruir camino
+        camino = self._reconstruir_camino(previos, origen, destino)
+
+        return {
+            'camino': camino,
+            'distancia': distancias[destino]
+        }
+
+    def _busqueda_dependiente(self, origen, destino, salida, pasos=None):
+        """Dijkstra dependiente del tiempo: la etiqueta es la hora de llegada
+        y cada ruta cuesta su perfil evaluado a esa hora (o su tiempo fijo).
+
+        Con perfiles FIFO esperar nunca conviene, así que la primera vez que
+        se visita una ciudad su llegada es la más temprana posible.
+        """
+        llegadas = {origen: salida}
         previos = {}
-        pasos = []
+        cola = [(salida, origen)]
+
+        while cola:
+            llegada, ciudad_actual = heapq.heappop(cola)
+            if pasos is not None:
+                pasos.append(('visitando', ciudad_actual, llegada - salida))
 
-        cola = [(0, origen)]
+            if ciudad_actual == destino:
+                break
+            if llegada > llegadas[ciudad_actual]:
+                continue
+
+            for vecino, pesos_ruta in self.adyacencia[ciudad_actual].items():
+                perfil = self.perfiles.get((ciudad_actual, vecino))
+                if perfil is not None:
+                    nueva_llegada = llegada + perfil.tiempo(llegada)
+                else:
+                    nueva_llegada = llegada + pesos_ruta.get(
+                        'tiempo', pesos_ruta['distancia'])
+
+                if nueva_llegada < llegadas.get(vecino, math.inf):
+                    llegadas[vecino] = nueva_llegada
+                    previos[vecino] = ciudad_actual
+                    heapq.heappush(cola, (nueva_llegada, vecino))
+                    if pasos is not None:
+                        pasos.append(('actualizando', vecino, nueva_llegada - salida))
+
+        if destino not in previos and origen != destino:
+            raise ValueError(f"No hay camino de {origen} a {destino}")
+
+        return {
+            'camino': self._reconstruir_camino(previos, origen, destino),
+            'distancia': llegadas[destino] - salida,
+            'salida': salida,
+            'llegada': llegadas[destino]
+        }
+
+    def _expandir(self, origen, criterio, destino=None, heuristica=None,
+                  pasos=None, presupuesto=math.inf):
+        """Núcleo de Dijkstra/A*: retorna (distancias, previos).
+
+        Se detiene al visitar el destino; sin destino recorre todo el
+        componente y construye el árbol completo de caminos mínimos. Con
+        'presupuesto' no se registran ciudades cuyo costo lo supere.
+        """
+        # Inicialización: solo se registran las ciudades alcanzadas
+        distancias = {origen: 0}
+        previos = {}
+
+        prioridad = heuristica(origen) if heuristica else 0
+        cola = [(prioridad, 0, origen)]
 
         while cola:
-            dist_actual, ciudad_actual = heapq.heappop(cola)
-            pasos.append(('visitando', ciudad_actual, dist_actual))
+            _, dist_actual, ciudad_actual = heapq.heappop(cola)
+            if pasos is not None:
+                pasos.append(('visitando', ciudad_actual, dist_actual))
 
             if ciudad_actual == destino:
                 break
@@ -181,30 +1026,79 @@ class GrafoRutas:
             if dist_actual > distancias[ciudad_actual]:
                 continue
 
-            # Explorar vecinos
-            for (c1, c2), pesos_ruta in self.conexiones.items():
-                if c1 == ciudad_actual:
-                    vecino = c2
-                    peso = pesos_ruta.get(criterio, pesos_ruta['distancia'])
-                    nueva_dist = dist_actual + peso
-
-                    if nueva_dist < distancias[vecino]:
-                        distancias[vecino] = nueva_dist
-                        previos[vecino] = ciudad_actual
-                        heapq.heappush(cola, (nueva_dist, vecino))
+            # Explorar vecinos (solo aristas incidentes)
+            for vecino, pesos_ruta in self.adyacencia[ciudad_actual].items():
+                peso = pesos_ruta.get(criterio, pesos_ruta['distancia'])
+                nueva_dist = dist_actual + peso
+
+                if (nueva_dist < distancias.get(vecino, math.inf)
+                        and nueva_dist <= presupuesto):
+                    distancias[vecino] = nueva_dist
+                    previos[vecino] = ciudad_actual
+                    prioridad = nueva_dist
+                    if heuristica:
+                        prioridad += heuristica(vecino)
+                    heapq.heappush(cola, (prioridad, nueva_dist, vecino))
+                    if pasos is not None:
                         pasos.append(('actualizando', vecino, nueva_dist))
 
-        # Verificar si hay camino
-        if destino not in previos and origen != destino:
+        return distancias, previos
+
+    def _busqueda_bidireccional(self, origen, destino, criterio, pasos=None):
+        """Dijkstra bidireccional: avanza desde origen y destino a la vez.
+
+        Como agregar_ruta siempre crea ambos sentidos, la búsqueda hacia
+        atrás usa la misma lista de adyacencia. Termina cuando la suma de
+        los mínimos de ambas colas alcanza el mejor encuentro conocido.
+        """
+        distancias = ({origen: 0}, {destino: 0})
+        previos = ({}, {})
+        colas = ([(0, origen)], [(0, destino)])
+
+        mejor = 0 if origen == destino else math.inf
+        encuentro = origen if origen == destino else None
+
+        while colas[0] and colas[1]:
+            if colas[0][0][0] + colas[1][0][0] >= mejor:
+                break
+
+            # Expandir el lado con menor radio de búsqueda
+            lado = 0 if colas[0][0][0] <= colas[1][0][0] else 1
+            dist_actual, ciudad_actual = heapq.heappop(colas[lado])
+            if pasos is not None:
+                pasos.append(('visitando', ciudad_actual, dist_actual))
+
+            if dist_actual > distancias[lado][ciudad_actual]:
+                continue
+
+            otro_lado = distancias[1 - lado]
+            for vecino, pesos_ruta in self.adyacencia[ciudad_actual].items():
+                peso = pesos_ruta.get(criterio, pesos_ruta['distancia'])
+                nueva_dist = dist_actual + peso
+
+                if nueva_dist < distancias[lado].get(vecino, math.inf):
+                    distancias[lado][vecino] = nueva_dist
+                    previos[lado][vecino] = ciudad_actual
+                    heapq.heappush(colas[lado], (nueva_dist, vecino))
+                    if pasos is not None:
+                        pasos.append(('actualizando', vecino, nueva_dist))
+
+                # ¿Las dos búsquedas se encuentran en este vecino?
+                if vecino in otro_lado and nueva_dist + otro_lado[vecino] < mejor:
+                    mejor = nueva_dist + otro_lado[vecino]
+                    encuentro = vecino
+
+        if encuentro is None:
             raise ValueError(f"No hay camino de {origen} a {destino}")
 
-        # Reconstruir camino
-        camino = self._reconstruir_camino(previos, origen, destino)
+        # Unir origen → encuentro con encuentro → destino
+        camino = self._reconstruir_camino(previos[0], origen, encuentro)
+        tramo = self._reconstruir_camino(previos[1], destino, encuentro)
+        camino.extend(reversed(tramo[:-1]))
 
         return {
             'camino': camino,
-            'distancia': distancias[destino],
-            'pasos': pasos
+            'distancia': mejor
         }
 
     def _reconstruir_camino(self, previos, origen, destino):
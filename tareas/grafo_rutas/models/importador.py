@@ -0,0 +1,232 @@
+"""
+ARCHIVO: models/importador.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Importación en flujo de redes viales grandes desde CSV, NDJSON o
+             GeoJSON. Lee los registros por lotes, valida cada lote completo
+             (informando todas sus líneas erróneas) y entrega lotes de
+             ciudades y rutas a GrafoRutas.cargar_lotes, sin cargar el
+             archivo entero en memoria.
+
+FORMATOS (las ciudades deben aparecer antes que las rutas que las usan):
+    CSV:     encabezado con nombre,x,y y/o ciudad1,ciudad2,distancia,tiempo
+             (una fila con ciudad1 es una ruta; si no, una ciudad)
+    NDJSON:  un objeto JSON por línea con los mismos campos
+    GeoJSON: FeatureCollection con Point (properties.nombre) para ciudades y
+             LineString (properties.ciudad1, ciudad2, distancia, tiempo)
+             para rutas
+    Si falta 'tiempo' se estima con 60 km/h, como en agregar_ruta.
+
+DEPENDENCIAS: csv, itertools, json, math, os
+"""
+
+import csv
+import itertools
+import json
+import math
+import os
+
+# Registros por lote (validación y carga)
+TAM_LOTE = 10000
+
+# Errores informados como máximo por lote
+MAX_ERRORES = 20
+
+# Caracteres leídos por bloque al recorrer un GeoJSON
+BLOQUE_GEOJSON = 1 << 16
+
+FORMATOS = ('csv', 'ndjson', 'geojson')
+
+EXTENSIONES = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson',
+    '.geojson': 'geojson',
+    '.json': 'geojson',
+}
+
+
+def formato_de(nombre_archivo):
+    """Formato según la extensión del archivo (None si no se reconoce)"""
+    return EXTENSIONES.get(os.path.splitext(nombre_archivo or '')[1].lower())
+
+
+def leer_lotes(archivo, formato, tam_lote=TAM_LOTE):
+    """Genera ('ciudades', [(nombre, x, y)]) y ('rutas', [(c1, c2, pesos)])
+    leyendo 'archivo' (texto) por lotes de 'tam_lote' registros.
+
+    Lanza ValueError con las líneas inválidas del primer lote que las tenga.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato {formato} no soportado (use {', '.join(FORMATOS)})")
+    registros = _LECTORES[formato](archivo)
+    etiqueta = 'feature' if formato == 'geojson' else 'línea'
+
+    while True:
+        lote = list(itertools.islice(registros, tam_lote))
+        if not lote:
+            return
+
+        ciudades, rutas, errores = [], [], []
+        for linea, registro in lote:
+            try:
+                if isinstance(registro, Exception):
+                    raise registro
+                if not isinstance(registro, dict):
+                    raise ValueError("se esperaba un objeto")
+                if registro.get('ciudad1'):
+                    rutas.append(_ruta(registro))
+                else:
+                    ciudades.append(_ciudad(registro))
+            except (KeyError, TypeError, ValueError) as e:
+                errores.append(f"{etiqueta} {linea}: {_mensaje(e)}")
+
+        if errores:
+            extra = len(errores) - MAX_ERRORES
+            detalle = '; '.join(errores[:MAX_ERRORES])
+            if extra > 0:
+                detalle += f" (y {extra} más)"
+            raise ValueError(f"Datos inválidos: {detalle}")
+
+        if ciudades:
+            yield 'ciudades', ciudades
+        if rutas:
+            yield 'rutas', rutas
+
+
+def _ciudad(registro):
+    nombre = str(registro['nombre']).strip()
+    if not nombre:
+        raise ValueError("nombre vacío")
+    return nombre, _numero(registro, 'x'), _numero(registro, 'y')
+
+
+def _ruta(registro):
+    ciudad1 = str(registro['ciudad1']).strip()
+    ciudad2 = str(registro.get('ciudad2') or '').strip()
+    if not ciudad2:
+        raise ValueError("falta ciudad2")
+
+    distancia = _numero(registro, 'distancia')
+    if registro.get('tiempo') in (None, ''):
+        tiempo = round(distancia / 60, 1)
+    else:
+        tiempo = _numero(registro, 'tiempo')
+    if distancia <= 0 or tiempo <= 0:
+        raise ValueError("distancia y tiempo deben ser mayores a 0")
+    return ciudad1, ciudad2, {'distancia': distancia, 'tiempo': tiempo}
+
+
+def _numero(registro, campo):
+    valor = registro.get(campo)
+    try:
+        numero = float(valor)
+    except (TypeError, ValueError):
+        if valor in (None, ''):
+            raise ValueError(f"falta {campo}")
+        raise ValueError(f"{campo} no es numérico: {valor!r}")
+    if not math.isfinite(numero):
+        raise ValueError(f"{campo} no es finito")
+    return numero
+
+
+def _mensaje(error):
+    if isinstance(error, KeyError):
+        return f"falta {error.args[0]}"
+    return str(error)
+
+
+def _leer_csv(archivo):
+    lector = csv.reader(archivo)
+    campos = [campo.strip() for campo in next(lector, [])]
+    for fila in lector:
+        yield lector.line_num, dict(zip(campos, fila))
+
+
+def _leer_ndjson(archivo):
+    for linea, texto in enumerate(archivo, 1):
+        if not texto.strip():
+            continue
+        try:
+            yield linea, json.loads(texto)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Línea {linea}: JSON inválido ({e.msg})")
+
+
+def _leer_geojson(archivo):
+    """Recorre el arreglo 'features' de una FeatureCollection decodificando
+    un Feature a la vez (se numeran los Features, no las líneas)"""
+    decodificador = json.JSONDecoder()
+    texto, pos = archivo.read(BLOQUE_GEOJSON), 0
+
+    # Ubicar el inicio del arreglo "features"
+    while True:
+        inicio = texto.find('"features"')
+        corchete = texto.find('[', inicio) if inicio >= 0 else -1
+        if corchete >= 0:
+            pos = corchete + 1
+            break
+        bloque = archivo.read(BLOQUE_GEOJSON)
+        if not bloque:
+            raise ValueError("GeoJSON sin arreglo 'features'")
+        texto = (texto[inicio:] if inicio >= 0 else texto[-len('"features"'):]) + bloque
+
+    numero = 0
+    while True:
+        # Descartar lo ya leído para no retener el archivo completo
+        if pos > BLOQUE_GEOJSON:
+            texto, pos = texto[pos:], 0
+
+        while pos < len(texto) and texto[pos] in ' \t\r\n,':
+            pos += 1
+        if pos == len(texto):
+            bloque = archivo.read(BLOQUE_GEOJSON)
+            if not bloque:
+                raise ValueError("GeoJSON incompleto: falta cerrar 'features'")
+            texto, pos = bloque, 0
+            continue
+        if texto[pos] == ']':
+            return
+
+        numero += 1
+        while True:
+            try:
+                feature, pos = decodificador.raw_decode(texto, pos)
+                break
+            except json.JSONDecodeError as e:
+                # Puede ser un Feature cortado por el bloque: leer más
+                bloque = archivo.read(max(BLOQUE_GEOJSON, len(texto)))
+                if not bloque:
+                    raise ValueError(f"Feature {numero}: JSON inválido ({e.msg})")
+                texto, pos = texto[pos:] + bloque, 0
+        yield numero, _registro_geojson(feature)
+
+
+def _registro_geojson(feature):
+    """Convierte un Feature en un registro de ciudad (Point) o ruta
+    (LineString); si no es válido retorna el error para informarlo en bloque"""
+    if not isinstance(feature, dict):
+        return feature
+    propiedades = dict(feature.get('properties') or {})
+    geometria = feature.get('geometry') or {}
+    tipo = geometria.get('type')
+
+    if tipo == 'Point':
+        coordenadas = geometria.get('coordinates') or []
+        if len(coordenadas) < 2:
+            return ValueError("Point sin coordenadas")
+        propiedades['x'], propiedades['y'] = coordenadas[0], coordenadas[1]
+        propiedades.pop('ciudad1', None)
+        return propiedades
+    if tipo == 'LineString':
+        if not propiedades.get('ciudad1'):
+            return ValueError("LineString sin properties.ciudad1")
+        return propiedades
+    return ValueError(f"geometría {tipo} no soportada")
+
+
+_LECTORES = {
+    'csv': _leer_csv,
+    'ndjson': _leer_ndjson,
+    'geojson': _leer_geojson,
+}
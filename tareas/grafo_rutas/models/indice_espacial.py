@@ -0,0 +1,172 @@
+"""
+ARCHIVO: models/indice_espacial.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Índice espacial de rejilla uniforme sobre las coordenadas de las
+             ciudades. Responde las k ciudades más cercanas a un punto y las
+             ciudades dentro de un rectángulo revisando solo celdas vecinas.
+             Incluye la prueba de cruce segmento/rectángulo para las rutas.
+DEPENDENCIAS: heapq, math
+"""
+
+import heapq
+import math
+
+# Tamaño de celda por defecto (unidades del mapa SVG)
+TAM_CELDA = 50
+
+
+class IndiceEspacial:
+    def __init__(self, tam_celda=TAM_CELDA):
+        self.tam_celda = tam_celda
+        self.celdas = {}      # (cx, cy) → {nombre: (x, y)}
+        self.posiciones = {}  # nombre → (cx, cy)
+        # Celdas cuyo diccionario pertenece a este índice (no compartido)
+        self._propias = set()
+
+    def copiar(self):
+        """Copia superficial: las celdas se comparten hasta que una de las
+        copias las modifica (copia al escribir)"""
+        copia = IndiceEspacial(self.tam_celda)
+        copia.celdas = dict(self.celdas)
+        copia.posiciones = dict(self.posiciones)
+        self._propias = set()
+        return copia
+
+    @staticmethod
+    def tam_sugerido(coordenadas, por_celda=4):
+        """Tamaño de celda para ~'por_celda' ciudades por celda ocupada"""
+        coordenadas = list(coordenadas)
+        if len(coordenadas) < 2:
+            return TAM_CELDA
+        xs = [c[0] for c in coordenadas]
+        ys = [c[1] for c in coordenadas]
+        area = max(max(xs) - min(xs), 1) * max(max(ys) - min(ys), 1)
+        return max(math.sqrt(area * por_celda / len(coordenadas)), 1e-6)
+
+    def _celda(self, x, y):
+        return (math.floor(x / self.tam_celda), math.floor(y / self.tam_celda))
+
+    def insertar(self, nombre, x, y):
+        """Registra una ciudad en su celda"""
+        celda = self._celda(x, y)
+        self._celda_editable(celda)[nombre] = (x, y)
+        self.posiciones[nombre] = celda
+
+    def insertar_varias(self, ciudades):
+        """Registra de una vez muchas ciudades {nombre: (x, y)} (carga masiva)"""
+        tam = self.tam_celda
+        for nombre, (x, y) in ciudades.items():
+            celda = (math.floor(x / tam), math.floor(y / tam))
+            if celda in self._propias:
+                self.celdas[celda][nombre] = (x, y)
+            else:
+                self._celda_editable(celda)[nombre] = (x, y)
+            self.posiciones[nombre] = celda
+
+    def eliminar(self, nombre):
+        """Quita una ciudad del índice"""
+        celda = self.posiciones.pop(nombre)
+        contenido = self._celda_editable(celda)
+        del contenido[nombre]
+        if not contenido:
+            del self.celdas[celda]
+            self._propias.discard(celda)
+
+    def _celda_editable(self, celda):
+        """Diccionario de la celda, copiándolo antes si está compartido"""
+        if celda not in self._propias:
+            self.celdas[celda] = dict(self.celdas.get(celda, {}))
+            self._propias.add(celda)
+        return self.celdas[celda]
+
+    def en_rectangulo(self, xmin, ymin, xmax, ymax):
+        """Retorna {nombre: (x, y)} de las ciudades dentro del rectángulo"""
+        cx0, cy0 = self._celda(xmin, ymin)
+        cx1, cy1 = self._celda(xmax, ymax)
+        resultado = {}
+
+        # Si el rectángulo cubre más celdas que las ocupadas, recorrer estas
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self.celdas):
+            celdas = [c for c in self.celdas
+                      if cx0 <= c[0] <= cx1 and cy0 <= c[1] <= cy1]
+        else:
+            celdas = [(cx, cy) for cx in range(cx0, cx1 + 1)
+                      for cy in range(cy0, cy1 + 1) if (cx, cy) in self.celdas]
+
+        for celda in celdas:
+            for nombre, (x, y) in self.celdas[celda].items():
+                if xmin <= x <= xmax and ymin <= y <= ymax:
+                    resultado[nombre] = (x, y)
+        return resultado
+
+    def cercanas(self, x, y, k=1):
+        """Retorna [(distancia, nombre, (x, y))] de las k ciudades más
+        cercanas, recorriendo anillos de celdas alrededor del punto"""
+        if not self.posiciones or k < 1:
+            return []
+
+        cx, cy = self._celda(x, y)
+        mejores = []  # max-heap por distancia: (-distancia, nombre, (x, y))
+        radio = 0
+        encontradas = 0
+
+        while encontradas < len(self.posiciones):
+            # Punto lejos de las ciudades: recorrer anillos vacíos costaría
+            # más que revisar directamente las celdas ocupadas
+            if (2 * radio + 1) ** 2 > 4 * len(self.celdas):
+                celdas = [c for c in self.celdas
+                          if max(abs(c[0] - cx), abs(c[1] - cy)) >= radio]
+                radio = math.inf
+            else:
+                celdas = self._anillo(cx, cy, radio)
+
+            for celda in celdas:
+                for nombre, (px, py) in self.celdas.get(celda, {}).items():
+                    distancia = math.hypot(px - x, py - y)
+                    if len(mejores) < k:
+                        heapq.heappush(mejores, (-distancia, nombre, (px, py)))
+                    elif distancia < -mejores[0][0]:
+                        heapq.heapreplace(mejores, (-distancia, nombre, (px, py)))
+                    encontradas += 1
+
+            # Ninguna ciudad fuera de este anillo está a menos de radio·tam
+            if len(mejores) == k and -mejores[0][0] <= radio * self.tam_celda:
+                break
+            radio += 1
+
+        return sorted((-d, nombre, punto) for d, nombre, punto in mejores)
+
+    @staticmethod
+    def _anillo(cx, cy, radio):
+        """Celdas a distancia de Chebyshev exactamente 'radio'"""
+        if radio == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-radio, radio + 1):
+            yield (cx + dx, cy - radio)
+            yield (cx + dx, cy + radio)
+        for dy in range(-radio + 1, radio):
+            yield (cx - radio, cy + dy)
+            yield (cx + radio, cy + dy)
+
+
+def segmento_cruza_rectangulo(x1, y1, x2, y2, xmin, ymin, xmax, ymax):
+    """True si el segmento (x1, y1)-(x2, y2) toca el rectángulo
+    (recorte paramétrico de Liang-Barsky)"""
+    dx, dy = x2 - x1, y2 - y1
+    t0, t1 = 0.0, 1.0
+    for p, q in ((-dx, x1 - xmin), (dx, xmax - x1),
+                 (-dy, y1 - ymin), (dy, ymax - y1)):
+        if p == 0:
+            if q < 0:
+                return False
+            continue
+        t = q / p
+        if p < 0:
+            t0 = max(t0, t)
+        else:
+            t1 = min(t1, t)
+        if t0 > t1:
+            return False
+    return True
@@ -0,0 +1,252 @@
+"""
+ARCHIVO: models/jerarquia_contraccion.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Jerarquía de contracción (Contraction Hierarchies) para consultas
+             de camino mínimo sobre redes grandes. Se preprocesa una vez por
+             criterio y responde con una búsqueda bidireccional "hacia arriba".
+DEPENDENCIAS: heapq, math
+              threading, construcción en segundo plano de las jerarquías.
+"""
+
+import heapq
+import math
+import threading
+
+# Límite de ciudades asentadas en cada búsqueda de testigos
+MAX_ASENTADOS_TESTIGO = 60
+
+
+class JerarquiaContraccion:
+    def __init__(self, adyacencia, criterio='distancia'):
+        self.criterio = criterio
+        self.nivel = {}    # ciudad → orden de contracción
+        self.subida = {}   # ciudad → {vecino de mayor nivel: costo}
+        self.atajos = {}   # (ciudad1, ciudad2) → ciudad contraída intermedia
+        self._construir(adyacencia)
+
+    def _construir(self, adyacencia):
+        """Contrae las ciudades en orden de menor diferencia de aristas"""
+        grafo = {}
+        for ciudad, vecinos in adyacencia.items():
+            grafo[ciudad] = {
+                vecino: pesos.get(self.criterio, pesos['distancia'])
+                for vecino, pesos in vecinos.items() if vecino != ciudad
+            }
+
+        contraidos_vecinos = dict.fromkeys(grafo, 0)
+        cola = [(self._prioridad(grafo, c, self._atajos_necesarios(grafo, c),
+                                 contraidos_vecinos), c)
+                for c in grafo]
+        heapq.heapify(cola)
+
+        while cola:
+            _, ciudad = heapq.heappop(cola)
+
+            # Actualización perezosa: re-evaluar antes de contraer
+            atajos = self._atajos_necesarios(grafo, ciudad)
+            prioridad = self._prioridad(grafo, ciudad, atajos,
+                                        contraidos_vecinos)
+            if cola and prioridad > cola[0][0]:
+                heapq.heappush(cola, (prioridad, ciudad))
+                continue
+
+            self.nivel[ciudad] = len(self.nivel)
+            self.subida[ciudad] = dict(grafo[ciudad])
+
+            for u, v, costo in atajos:
+                if costo < grafo[u].get(v, math.inf):
+                    grafo[u][v] = costo
+                    grafo[v][u] = costo
+                    self.atajos[(u, v)] = ciudad
+                    self.atajos[(v, u)] = ciudad
+
+            for vecino in grafo.pop(ciudad):
+                del grafo[vecino][ciudad]
+                contraidos_vecinos[vecino] += 1
+
+    def _prioridad(self, grafo, ciudad, atajos, contraidos_vecinos):
+        """Diferencia de aristas más vecinos ya contraídos"""
+        return len(atajos) - len(grafo[ciudad]) + contraidos_vecinos[ciudad]
+
+    def _atajos_necesarios(self, grafo, ciudad):
+        """Lista (u, v, costo) de los pares sin camino testigo más corto"""
+        atajos = []
+        vecinos = list(grafo[ciudad].items())
+        for i, (u, costo_u) in enumerate(vecinos[:-1]):
+            restantes = vecinos[i + 1:]
+            limite = costo_u + max(costo for _, costo in restantes)
+            testigos = self._buscar_testigos(grafo, u, ciudad, limite)
+            for v, costo_v in restantes:
+                costo = costo_u + costo_v
+                if testigos.get(v, math.inf) > costo:
+                    atajos.append((u, v, costo))
+        return atajos
+
+    def _buscar_testigos(self, grafo, origen, excluida, limite):
+        """Dijkstra acotado desde origen que ignora la ciudad a contraer"""
+        distancias = {origen: 0}
+        cola = [(0, origen)]
+        asentados = 0
+
+        while cola and asentados < MAX_ASENTADOS_TESTIGO:
+            dist_actual, actual = heapq.heappop(cola)
+            if dist_actual > distancias[actual]:
+                continue
+            if dist_actual > limite:
+                break
+            asentados += 1
+
+            for vecino, costo in grafo[actual].items():
+                if vecino == excluida:
+                    continue
+                nueva_dist = dist_actual + costo
+                if nueva_dist < distancias.get(vecino, math.inf):
+                    distancias[vecino] = nueva_dist
+                    heapq.heappush(cola, (nueva_dist, vecino))
+
+        return distancias
+
+    def consultar(self, origen, destino, pasos=None):
+        """Búsqueda bidireccional solo hacia ciudades de mayor nivel"""
+        distancias = ({origen: 0}, {destino: 0})
+        previos = ({}, {})
+        colas = ([(0, origen)], [(0, destino)])
+
+        mejor = 0 if origen == destino else math.inf
+        encuentro = origen if origen == destino else None
+
+        while colas[0] or colas[1]:
+            # Cada lado se detiene cuando su mínimo supera el mejor encuentro
+            for lado in (0, 1):
+                cola = colas[lado]
+                if cola and cola[0][0] >= mejor:
+                    cola.clear()
+                if not cola:
+                    continue
+
+                dist_actual, actual = heapq.heappop(cola)
+                if dist_actual > distancias[lado][actual]:
+                    continue
+                if pasos is not None:
+                    pasos.append(('visitando', actual, dist_actual))
+
+                otro_lado = distancias[1 - lado]
+                if actual in otro_lado and dist_actual + otro_lado[actual] < mejor:
+                    mejor = dist_actual + otro_lado[actual]
+                    encuentro = actual
+
+                for vecino, costo in self.subida.get(actual, {}).items():
+                    nueva_dist = dist_actual + costo
+                    if nueva_dist < distancias[lado].get(vecino, math.inf):
+                        distancias[lado][vecino] = nueva_dist
+                        previos[lado][vecino] = actual
+                        heapq.heappush(cola, (nueva_dist, vecino))
+                        if pasos is not None:
+                            pasos.append(('actualizando', vecino, nueva_dist))
+
+        if encuentro is None:
+            return None
+
+        # Camino en la jerarquía: origen ↑ encuentro ↓ destino
+        subida = [encuentro]
+        while subida[-1] in previos[0]:
+            subida.append(previos[0][subida[-1]])
+        subida.reverse()
+        bajada = []
+        actual = encuentro
+        while actual in previos[1]:
+            actual = previos[1][actual]
+            bajada.append(actual)
+
+        return {
+            'camino': self._desempaquetar(subida + bajada),
+            'distancia': mejor
+        }
+
+    def _desempaquetar(self, camino_jerarquia):
+        """Reemplaza cada atajo por las ciudades que representa"""
+        camino = [camino_jerarquia[0]]
+        pila = list(zip(camino_jerarquia[:-1], camino_jerarquia[1:]))
+        pila.reverse()
+
+        while pila:
+            desde, hasta = pila.pop()
+            intermedia = self.atajos.get((desde, hasta))
+            if intermedia is None:
+                camino.append(hasta)
+            else:
+                pila.append((intermedia, hasta))
+                pila.append((desde, intermedia))
+
+        return camino
+
+
+class CacheJerarquias:
+    """Jerarquías por criterio, compartidas por el grafo y sus instantáneas.
+
+    Cada jerarquía vale para una versión del grafo. Se construye una sola
+    vez por versión (en un hilo aparte o con construir), nunca dentro de una
+    consulta: mientras falte, obtener retorna None y quien consulta usa otro
+    algoritmo exacto.
+    """
+
+    def __init__(self):
+        self._jerarquias = {}     # criterio → (versión, JerarquiaContraccion)
+        self._en_curso = set()    # criterios con una construcción en marcha
+        self._bloqueo = threading.Lock()
+        self._terminada = threading.Condition(self._bloqueo)
+
+    def obtener(self, criterio, version):
+        """Jerarquía del criterio para 'version', o None si no está lista"""
+        with self._bloqueo:
+            actual = self._jerarquias.get(criterio)
+            if actual is not None and actual[0] == version:
+                return actual[1]
+            return None
+
+    def construir_en_segundo_plano(self, criterio, version, adyacencia):
+        """Lanza la construcción de 'version' si no hay otra en marcha ni
+        una jerarquía igual o más reciente. 'adyacencia' no debe cambiar
+        mientras se construye (la de una instantánea)."""
+        with self._bloqueo:
+            actual = self._jerarquias.get(criterio)
+            if criterio in self._en_curso or (actual is not None and actual[0] >= version):
+                return
+            self._en_curso.add(criterio)
+        threading.Thread(target=self._construir,
+                         args=(criterio, version, adyacencia),
+                         daemon=True).start()
+
+    def construir(self, criterio, version, adyacencia):
+        """Construye la jerarquía de 'version' y la retorna (espera a la
+        construcción en marcha del mismo criterio en vez de repetirla)"""
+        with self._terminada:
+            while criterio in self._en_curso:
+                self._terminada.wait()
+            actual = self._jerarquias.get(criterio)
+            if actual is not None and actual[0] == version:
+                return actual[1]
+            self._en_curso.add(criterio)
+        return self._construir(criterio, version, adyacencia)
+
+    def _construir(self, criterio, version, adyacencia):
+        jerarquia = None
+        try:
+            jerarquia = JerarquiaContraccion(adyacencia, criterio)
+            return jerarquia
+        finally:
+            with self._terminada:
+                self._en_curso.discard(criterio)
+                actual = self._jerarquias.get(criterio)
+                if jerarquia is not None and (actual is None or actual[0] < version):
+                    self._jerarquias[criterio] = (version, jerarquia)
+                self._terminada.notify_all()
+
+    def migrar(self, version_anterior, version):
+        """Un cambio que no altera las rutas: las jerarquías de
+        'version_anterior' siguen valiendo para 'version'"""
+        with self._bloqueo:
+            for criterio, (vigente, jerarquia) in list(self._jerarquias.items()):
+                if vigente == version_anterior:
+                    self._jerarquias[criterio] = (version, jerarquia)
@@ -0,0 +1,66 @@
+"""
+ARCHIVO: models/matriz_costos.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Matrices N×N de costos (distancia/tiempo) entre un subconjunto de
+             ciudades. Una búsqueda uno-a-todos por ciudad fuente; se pueden
+             calcular solo las filas de un bloque de orígenes, para que el
+             controlador reparta la matriz en el pool de trabajos.
+DEPENDENCIAS: heapq, math
+"""
+
+import heapq
+import math
+
+# Con menos búsquedas que esto no compensa repartir la matriz entre procesos
+MIN_BUSQUEDAS_PARALELO = 64
+
+
+def compactar_adyacencia(adyacencia, criterios):
+    """Convierte la adyacencia a {criterio: {ciudad: [(vecino, costo)]}}"""
+    return {
+        criterio: {
+            ciudad: [(vecino, pesos.get(criterio, pesos['distancia']))
+                     for vecino, pesos in vecinos.items()]
+            for ciudad, vecinos in adyacencia.items()
+        }
+        for criterio in criterios
+    }
+
+
+def costos_desde(grafo, origen, criterio, objetivos):
+    """Dijkstra desde origen hasta asentar todos los objetivos.
+
+    Retorna la lista de costos en el orden de 'objetivos' (inf si alguno no
+    es alcanzable).
+    """
+    adyacencia = grafo[criterio]
+    pendientes = set(objetivos)
+    distancias = {origen: 0}
+    cola = [(0, origen)]
+
+    while cola and pendientes:
+        dist_actual, actual = heapq.heappop(cola)
+        if dist_actual > distancias[actual]:
+            continue
+        pendientes.discard(actual)
+
+        for vecino, costo in adyacencia[actual]:
+            nueva_dist = dist_actual + costo
+            if nueva_dist < distancias.get(vecino, math.inf):
+                distancias[vecino] = nueva_dist
+                heapq.heappush(cola, (nueva_dist, vecino))
+
+    return [distancias.get(objetivo, math.inf) for objetivo in objetivos]
+
+
+def calcular_matriz(adyacencia, ciudades, criterios, origenes=None):
+    """Retorna {criterio: filas} con una fila por ciudad de 'origenes'
+    (por defecto 'ciudades') y una columna por ciudad de 'ciudades'"""
+    origenes = ciudades if origenes is None else origenes
+    grafo = compactar_adyacencia(adyacencia, criterios)
+    return {
+        criterio: [costos_desde(grafo, origen, criterio, ciudades)
+                   for origen in origenes]
+        for criterio in criterios
+    }
@@ -0,0 +1,101 @@
+"""
+ARCHIVO: models/orden_paradas.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Orden óptimo de paradas intermedias entre un origen y un destino
+             fijos, sobre una tabla de costos ya calculada. Held-Karp exacto
+             para pocas paradas; vecino más cercano + 2-opt para muchas.
+DEPENDENCIAS: math
+"""
+
+import math
+
+# Hasta cuántas paradas se usa la búsqueda exacta (O(2^k · k²))
+MAX_PARADAS_EXACTO = 10
+
+
+def ordenar_paradas(costos):
+    """Retorna el orden de visita de las paradas.
+
+    'costos' es una matriz (k+2)×(k+2): índice 0 = origen, 1..k = paradas,
+    k+1 = destino. El resultado es la lista de índices de paradas (1..k).
+    """
+    k = len(costos) - 2
+    if k <= 1:
+        return list(range(1, k + 1))
+    if k <= MAX_PARADAS_EXACTO:
+        return _held_karp(costos, k)
+    return _dos_opt(costos, _vecino_mas_cercano(costos, k))
+
+
+def _held_karp(costos, k):
+    """Programación dinámica sobre subconjuntos de paradas"""
+    # mejor[mascara][j]: costo mínimo desde el origen visitando 'mascara'
+    # y terminando en la parada j (bit j-1 de la máscara)
+    completo = (1 << k) - 1
+    mejor = [[math.inf] * (k + 1) for _ in range(1 << k)]
+    previo = [[0] * (k + 1) for _ in range(1 << k)]
+    for j in range(1, k + 1):
+        mejor[1 << (j - 1)][j] = costos[0][j]
+
+    for mascara in range(1, completo + 1):
+        for j in range(1, k + 1):
+            costo_j = mejor[mascara][j]
+            if costo_j == math.inf:
+                continue
+            for siguiente in range(1, k + 1):
+                bit = 1 << (siguiente - 1)
+                if mascara & bit:
+                    continue
+                costo = costo_j + costos[j][siguiente]
+                if costo < mejor[mascara | bit][siguiente]:
+                    mejor[mascara | bit][siguiente] = costo
+                    previo[mascara | bit][siguiente] = j
+
+    destino = k + 1
+    ultimo = min(range(1, k + 1),
+                 key=lambda j: mejor[completo][j] + costos[j][destino])
+    if mejor[completo][ultimo] + costos[ultimo][destino] == math.inf:
+        # Ningún recorrido visita todas las paradas: el orden dado permite
+        # informar qué tramo no tiene camino
+        return list(range(1, k + 1))
+
+    # Reconstruir el orden hacia atrás
+    orden = []
+    mascara = completo
+    while ultimo:
+        orden.append(ultimo)
+        ultimo, mascara = previo[mascara][ultimo], mascara & ~(1 << (ultimo - 1))
+    orden.reverse()
+    return orden
+
+
+def _vecino_mas_cercano(costos, k):
+    """Recorrido inicial: siempre la parada pendiente más barata"""
+    pendientes = set(range(1, k + 1))
+    orden = []
+    actual = 0
+    while pendientes:
+        actual = min(pendientes, key=lambda j: costos[actual][j])
+        pendientes.remove(actual)
+        orden.append(actual)
+    return orden
+
+
+def _dos_opt(costos, orden):
+    """Invierte tramos mientras reduzcan el costo (extremos fijos).
+
+    Supone costos simétricos, como los de GrafoRutas.
+    """
+    secuencia = [0] + orden + [len(costos) - 1]
+    mejora = True
+    while mejora:
+        mejora = False
+        for i in range(1, len(secuencia) - 2):
+            for j in range(i + 1, len(secuencia) - 1):
+                a, b = secuencia[i - 1], secuencia[i]
+                c, d = secuencia[j], secuencia[j + 1]
+                if costos[a][c] + costos[b][d] < costos[a][b] + costos[c][d] - 1e-9:
+                    secuencia[i:j + 1] = reversed(secuencia[i:j + 1])
+                    mejora = True
+    return secuencia[1:-1]
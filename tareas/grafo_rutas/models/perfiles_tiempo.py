@@ -0,0 +1,119 @@
+"""
+ARCHIVO: models/perfiles_tiempo.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Perfiles de tiempo de viaje según la hora de salida: funciones
+             lineales por tramos y periódicas (24 h) definidas por puntos
+             (hora, tiempo). Los arreglos se guardan compactos (8 bytes por
+             valor) y se comparten: todas las rutas con la misma grilla de
+             horas (p. ej. 96 muestras cada 15 min) usan un solo arreglo de
+             horas, y los perfiles idénticos son el mismo objeto. Las tablas
+             de compartidos guardan referencias débiles: un arreglo o perfil
+             que ya no usa ninguna ruta se libera.
+             Se exige FIFO (salir más tarde nunca hace llegar antes), la
+             condición para que Dijkstra dependiente del tiempo sea exacto.
+DEPENDENCIAS: array, bisect, math, threading, weakref
+"""
+
+import array
+import bisect
+import math
+import threading
+import weakref
+
+# Período de los perfiles en horas (se repiten cada día)
+PERIODO = 24.0
+
+# Máximo de puntos por perfil (uno por minuto)
+MAX_PUNTOS = 1440
+
+# Arreglos y perfiles compartidos: bytes → memoryview, (id, id) → perfil.
+# Referencias débiles: con perfiles de tráfico que se actualizan seguido,
+# los valores reemplazados no se acumulan durante la vida del proceso
+_arreglos = weakref.WeakValueDictionary()
+_perfiles = weakref.WeakValueDictionary()
+_bloqueo = threading.Lock()
+
+
+class PerfilTiempo:
+    __slots__ = ('horas', 'tiempos', '__weakref__')
+
+    def __init__(self, horas, tiempos):
+        self.horas = horas      # memoryview 'd', horas crecientes en [0, 24)
+        self.tiempos = tiempos  # memoryview 'd', horas de viaje en cada punto
+
+    def tiempo(self, salida):
+        """Horas de viaje saliendo a la hora 'salida' (interpolación lineal,
+        del último punto se vuelve al primero del día siguiente)"""
+        horas, tiempos = self.horas, self.tiempos
+        if len(horas) == 1:
+            return tiempos[0]
+
+        hora = salida % PERIODO
+        i = bisect.bisect_right(horas, hora) - 1
+        if i < 0:
+            h0, t0 = horas[-1] - PERIODO, tiempos[-1]
+            h1, t1 = horas[0], tiempos[0]
+        elif i == len(horas) - 1:
+            h0, t0 = horas[i], tiempos[i]
+            h1, t1 = horas[0] + PERIODO, tiempos[0]
+        else:
+            h0, t0 = horas[i], tiempos[i]
+            h1, t1 = horas[i + 1], tiempos[i + 1]
+        return t0 + (t1 - t0) * (hora - h0) / (h1 - h0)
+
+    def __reduce__(self):
+        # memoryview no se serializa: se recrea (y se comparte) al cargar
+        return crear_perfil, (self.horas.tolist(), self.tiempos.tolist())
+
+
+def crear_perfil(horas, tiempos):
+    """Valida los puntos y retorna el PerfilTiempo compartido equivalente.
+
+    Lanza ValueError si las horas no son crecientes en [0, 24), si algún
+    tiempo no es positivo o si el perfil viola FIFO (pendiente < -1).
+    """
+    try:
+        horas = [float(h) for h in horas]
+        tiempos = [float(t) for t in tiempos]
+    except (TypeError, ValueError):
+        raise ValueError("horas y tiempos deben ser listas de números")
+
+    if not horas or len(horas) != len(tiempos):
+        raise ValueError("horas y tiempos deben tener la misma cantidad (al menos 1)")
+    if len(horas) > MAX_PUNTOS:
+        raise ValueError(f"Máximo {MAX_PUNTOS} puntos por perfil")
+    if not all(0 <= h < PERIODO for h in horas):
+        raise ValueError("Las horas deben estar en [0, 24)")
+    if any(h1 <= h0 for h0, h1 in zip(horas, horas[1:])):
+        raise ValueError("Las horas deben ser estrictamente crecientes")
+    if not all(0 < t < math.inf for t in tiempos):
+        raise ValueError("Los tiempos deben ser positivos")
+
+    # FIFO: llegada = salida + tiempo(salida) no decrece → pendiente ≥ -1
+    # (incluido el tramo que cruza la medianoche)
+    siguientes = list(zip(horas[1:], tiempos[1:])) + [(horas[0] + PERIODO, tiempos[0])]
+    for (h0, t0), (h1, t1) in zip(zip(horas, tiempos), siguientes):
+        if t1 - t0 < -(h1 - h0):
+            raise ValueError(
+                f"El perfil no cumple FIFO entre las {h0:g} h y las {h1 % PERIODO:g} h: "
+                "salir más tarde llegaría antes")
+
+    with _bloqueo:
+        horas = _compartir(horas)
+        tiempos = _compartir(tiempos)
+        # Las claves por id son únicas: el perfil mantiene vivos sus arreglos
+        clave = (id(horas), id(tiempos))
+        perfil = _perfiles.get(clave)
+        if perfil is None:
+            perfil = _perfiles[clave] = PerfilTiempo(horas, tiempos)
+        return perfil
+
+
+def _compartir(valores):
+    """memoryview de solo lectura compartido para estos valores"""
+    datos = array.array('d', valores).tobytes()
+    vista = _arreglos.get(datos)
+    if vista is None:
+        vista = _arreglos[datos] = memoryview(datos).cast('d')
+    return vista
@@ -0,0 +1,243 @@
+"""
+ARCHIVO: models/persistencia.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Instantánea binaria compacta del grafo. Los nombres, las
+             coordenadas y la lista de adyacencia (formato CSR: inicio por
+             ciudad, destinos, distancias y tiempos) se guardan como arreglos
+             contiguos que se leen mapeando el archivo en memoria, sin
+             analizar texto. Al cargar, el grafo copia los arreglos a sus
+             diccionarios (O(V+E)); el archivo no queda compartido.
+
+FORMATO (orden de bytes nativo, indicado en el encabezado):
+    encabezado   mágico, orden de bytes, ciudades N, entradas E, bytes de nombres
+    Q[N+1]       desplazamiento de cada nombre dentro del bloque de nombres
+    d[2N]        coordenadas x, y
+    Q[N+1]       inicio de los vecinos de cada ciudad en los arreglos de aristas
+    I[E]         índice del vecino
+    d[E]         distancia
+    d[E]         tiempo
+    bytes        nombres en UTF-8, uno tras otro
+    Q[2]         rutas con perfil de tiempo P, perfiles distintos D
+    Q[P]         entrada (en los arreglos de aristas) de cada ruta con perfil,
+                 desde su extremo de menor índice
+    Q[P]         perfil de cada una de esas rutas (0..D-1)
+    Q[D+1]       inicio de los puntos de cada perfil
+    d[M]         horas de los puntos
+    d[M]         tiempos de los puntos
+    Cada sección comienza en un múltiplo de 8 bytes. Cada ruta aparece dos
+    veces (una por extremo), igual que en la lista de adyacencia. Los
+    archivos anteriores a los perfiles terminan en los nombres y se leen
+    sin perfiles.
+
+DEPENDENCIAS: array, bisect, mmap, os, struct, sys, models.perfiles_tiempo
+"""
+
+import array
+import bisect
+import mmap
+import os
+import struct
+import sys
+
+from models.perfiles_tiempo import crear_perfil
+
+MAGICO = b'GRAFORUT'
+
+# Mágico, orden de bytes ('little'/'big' en 8 bytes), N, E, bytes de nombres
+ENCABEZADO = struct.Struct('<8s8sQQQ')
+
+# Ciudades por lote al reconstruir el grafo desde el archivo
+TAM_LOTE = 10000
+
+
+def guardar_mapa(grafo, ruta):
+    """Escribe la instantánea binaria de 'grafo' en 'ruta'.
+
+    Se escribe en un archivo temporal que luego reemplaza al anterior: un
+    proceso que lee el archivo nunca ve una instantánea a medias.
+    """
+    nombres = list(grafo.ciudades)
+    indices = {nombre: i for i, nombre in enumerate(nombres)}
+    codificados = [nombre.encode('utf-8') for nombre in nombres]
+
+    desplazamientos = array.array('Q', [0])
+    for nombre in codificados:
+        desplazamientos.append(desplazamientos[-1] + len(nombre))
+
+    coordenadas = array.array('d')
+    inicio = array.array('Q', [0])
+    destinos = array.array('I')
+    distancias = array.array('d')
+    tiempos = array.array('d')
+    # Cada perfil se guarda una vez aunque lo compartan varias rutas
+    perfiles = grafo.perfiles
+    entradas_perfil = array.array('Q')
+    numeros_perfil = array.array('Q')
+    distintos = {}  # id(perfil) → número
+    for nombre in nombres:
+        coordenadas.extend(grafo.ciudades[nombre])
+        for vecino, pesos in grafo.adyacencia[nombre].items():
+            perfil = perfiles.get((nombre, vecino)) if perfiles else None
+            if perfil is not None and indices[nombre] <= indices[vecino]:
+                entradas_perfil.append(len(destinos))
+                numeros_perfil.append(
+                    distintos.setdefault(id(perfil), (len(distintos), perfil))[0])
+            destinos.append(indices[vecino])
+            distancias.append(pesos['distancia'])
+            tiempos.append(pesos.get('tiempo', pesos['distancia']))
+        inicio.append(len(destinos))
+
+    inicio_puntos = array.array('Q', [0])
+    horas = array.array('d')
+    tiempos_perfil = array.array('d')
+    for _, perfil in distintos.values():
+        horas.extend(perfil.horas)
+        tiempos_perfil.extend(perfil.tiempos)
+        inicio_puntos.append(len(horas))
+
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'wb') as archivo:
+        archivo.write(ENCABEZADO.pack(
+            MAGICO, sys.byteorder.encode(), len(nombres), len(destinos),
+            desplazamientos[-1]))
+        for seccion in (desplazamientos, coordenadas, inicio, destinos,
+                        distancias, tiempos):
+            seccion.tofile(archivo)
+            archivo.write(b'\0' * (-archivo.tell() % 8))
+        for nombre in codificados:
+            archivo.write(nombre)
+        archivo.write(b'\0' * (-archivo.tell() % 8))
+        for seccion in (array.array('Q', [len(entradas_perfil), len(distintos)]),
+                        entradas_perfil, numeros_perfil, inicio_puntos, horas,
+                        tiempos_perfil):
+            seccion.tofile(archivo)
+            archivo.write(b'\0' * (-archivo.tell() % 8))
+    os.replace(temporal, ruta)
+
+
+class MapaBinario:
+    """Instantánea binaria mapeada en memoria (solo lectura).
+
+    Los arreglos son memoryview sobre las páginas del archivo, válidas solo
+    mientras esté abierto: quien los necesite después (GrafoRutas al
+    cargar) los copia. Usar con 'with' (o llamar a cerrar()) para liberar
+    el mapeo.
+    """
+
+    def __init__(self, ruta):
+        with open(ruta, 'rb') as archivo:
+            self._mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._leer_secciones()
+        except Exception:
+            self.cerrar()
+            raise
+
+    def _leer_secciones(self):
+        if len(self._mapa) < ENCABEZADO.size:
+            raise ValueError("Archivo de mapa incompleto")
+        magico, orden, n, entradas, bytes_nombres = ENCABEZADO.unpack_from(self._mapa)
+        if magico != MAGICO:
+            raise ValueError("El archivo no es una instantánea de GrafoRutas")
+        if orden.rstrip(b'\0').decode() != sys.byteorder:
+            raise ValueError("Instantánea guardada con otro orden de bytes")
+
+        self.ciudades = n
+        self.entradas = entradas
+        self._vista = memoryview(self._mapa)
+        self._secciones = []
+        posicion = ENCABEZADO.size
+
+        def seccion(formato, cantidad):
+            nonlocal posicion
+            tam = cantidad * struct.calcsize(formato)
+            if posicion + tam > len(self._mapa):
+                raise ValueError("Archivo de mapa incompleto")
+            datos = self._vista[posicion:posicion + tam].cast(formato)
+            self._secciones.append(datos)
+            posicion += tam + (-(posicion + tam) % 8)
+            return datos
+
+        self.desplazamientos = seccion('Q', n + 1)
+        self.coordenadas = seccion('d', 2 * n)
+        self.inicio = seccion('Q', n + 1)
+        self.destinos = seccion('I', entradas)
+        self.distancias = seccion('d', entradas)
+        self.tiempos = seccion('d', entradas)
+        self.bloque_nombres = seccion('B', bytes_nombres)
+
+        # Perfiles de tiempo (ausentes en archivos anteriores a ellos)
+        self.perfiles = 0
+        if posicion + 16 <= len(self._mapa):
+            self.perfiles, distintos = seccion('Q', 2)
+            self.entradas_perfil = seccion('Q', self.perfiles)
+            self.numeros_perfil = seccion('Q', self.perfiles)
+            self.inicio_puntos = seccion('Q', distintos + 1)
+            self.horas_perfil = seccion('d', self.inicio_puntos[distintos])
+            self.tiempos_perfil = seccion('d', self.inicio_puntos[distintos])
+
+    def nombres(self):
+        """Lista de nombres en orden de índice"""
+        texto = self.bloque_nombres.tobytes()
+        desplazamientos = self.desplazamientos.tolist()
+        return [texto[desplazamientos[i]:desplazamientos[i + 1]].decode('utf-8')
+                for i in range(self.ciudades)]
+
+    def lotes(self, tam_lote=TAM_LOTE):
+        """Lotes ('ciudades', ...), ('rutas', ...) y ('perfiles', ...) para
+        GrafoRutas.cargar_lotes; cada ruta se entrega una sola vez (desde su
+        extremo de menor índice)"""
+        nombres = self.nombres()
+        coordenadas = self.coordenadas
+        for desde in range(0, self.ciudades, tam_lote):
+            hasta = min(desde + tam_lote, self.ciudades)
+            xy = coordenadas[2 * desde:2 * hasta].tolist()
+            yield 'ciudades', [(nombres[i], xy[2 * (i - desde)], xy[2 * (i - desde) + 1])
+                               for i in range(desde, hasta)]
+
+        inicio = self.inicio
+        for desde in range(0, self.ciudades, tam_lote):
+            hasta = min(desde + tam_lote, self.ciudades)
+            primera, ultima = inicio[desde], inicio[hasta]
+            limites = inicio[desde:hasta + 1].tolist()
+            destinos = self.destinos[primera:ultima].tolist()
+            distancias = self.distancias[primera:ultima].tolist()
+            tiempos = self.tiempos[primera:ultima].tolist()
+
+            rutas = []
+            for i in range(desde, hasta):
+                for k in range(limites[i - desde] - primera,
+                               limites[i - desde + 1] - primera):
+                    j = destinos[k]
+                    if i <= j:
+                        rutas.append((nombres[i], nombres[j], {
+                            'distancia': distancias[k], 'tiempo': tiempos[k]}))
+            yield 'rutas', rutas
+
+        if self.perfiles:
+            creados = {}
+            registros = []
+            for entrada, numero in zip(self.entradas_perfil.tolist(),
+                                       self.numeros_perfil.tolist()):
+                if numero not in creados:
+                    a, b = self.inicio_puntos[numero], self.inicio_puntos[numero + 1]
+                    creados[numero] = crear_perfil(self.horas_perfil[a:b].tolist(),
+                                                   self.tiempos_perfil[a:b].tolist())
+                i = bisect.bisect_right(inicio, entrada) - 1
+                registros.append((nombres[i], nombres[self.destinos[entrada]],
+                                  creados[numero]))
+            yield 'perfiles', registros
+
+    def cerrar(self):
+        for datos in getattr(self, '_secciones', ()):
+            datos.release()
+        if getattr(self, '_vista', None) is not None:
+            self._vista.release()
+        self._mapa.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.cerrar()
@@ -0,0 +1,112 @@
+"""
+ARCHIVO: models/rutas_alternativas.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: K rutas más cortas sin ciclos (algoritmo de Yen). Las aristas y
+             ciudades excluidas se manejan con una máscara temporal, sin
+             modificar el grafo compartido.
+DEPENDENCIAS: heapq, math
+"""
+
+import heapq
+import math
+
+
+def k_rutas_mas_cortas(adyacencia, arbol_destino, origen, destino, k,
+                       criterio='distancia'):
+    """Retorna hasta k rutas sin ciclos, ordenadas por costo.
+
+    'arbol_destino' es el árbol de caminos mínimos con raíz en el destino
+    (las rutas son simétricas). Se reutiliza en cada desvío: si el camino
+    del árbol no toca la máscara es la respuesta directa; si no, sus
+    distancias guían una búsqueda A* exacta.
+    """
+    if not arbol_destino.alcanza(origen):
+        return []
+
+    primera = arbol_destino.camino(origen)
+    primera.reverse()
+    rutas = [{'camino': primera, 'distancia': arbol_destino.distancias[origen]}]
+    candidatas = []
+    vistas = {tuple(primera)}
+
+    while len(rutas) < k:
+        anterior = rutas[-1]['camino']
+        costo_raiz = 0
+
+        for j, desvio in enumerate(anterior[:-1]):
+            raiz = anterior[:j + 1]
+            aristas_bloqueadas = {
+                (ruta['camino'][j], ruta['camino'][j + 1])
+                for ruta in rutas
+                if len(ruta['camino']) > j + 1 and ruta['camino'][:j + 1] == raiz
+            }
+            ciudades_bloqueadas = set(raiz[:-1])
+
+            tramo = _camino_con_mascara(
+                adyacencia, arbol_destino, desvio, destino, criterio,
+                aristas_bloqueadas, ciudades_bloqueadas)
+            if tramo is not None:
+                camino, costo = tramo
+                camino = raiz[:-1] + camino
+                if tuple(camino) not in vistas:
+                    vistas.add(tuple(camino))
+                    heapq.heappush(candidatas, (costo_raiz + costo, camino))
+
+            pesos = adyacencia[desvio][anterior[j + 1]]
+            costo_raiz += pesos.get(criterio, pesos['distancia'])
+
+        if not candidatas:
+            break
+        costo, camino = heapq.heappop(candidatas)
+        rutas.append({'camino': camino, 'distancia': costo})
+
+    return rutas
+
+
+def _camino_con_mascara(adyacencia, arbol_destino, origen, destino, criterio,
+                        aristas_bloqueadas, ciudades_bloqueadas):
+    """Camino mínimo origen → destino evitando la máscara, o None"""
+    # 1) Camino del árbol: óptimo sin restricciones; sirve si no toca la máscara
+    camino = [origen]
+    libre = True
+    while camino[-1] != destino:
+        siguiente = arbol_destino.previos[camino[-1]]
+        if (siguiente in ciudades_bloqueadas
+                or (camino[-1], siguiente) in aristas_bloqueadas):
+            libre = False
+            break
+        camino.append(siguiente)
+    if libre:
+        return camino, arbol_destino.distancias[origen]
+
+    # 2) A* con la distancia exacta al destino (en el grafo sin máscara)
+    #    como heurística consistente
+    restante = arbol_destino.distancias
+    distancias = {origen: 0}
+    previos = {}
+    cola = [(restante[origen], 0, origen)]
+
+    while cola:
+        _, dist_actual, actual = heapq.heappop(cola)
+        if actual == destino:
+            camino = [destino]
+            while camino[-1] in previos:
+                camino.append(previos[camino[-1]])
+            camino.reverse()
+            return camino, dist_actual
+        if dist_actual > distancias[actual]:
+            continue
+
+        for vecino, pesos in adyacencia[actual].items():
+            if (vecino in ciudades_bloqueadas or vecino not in restante
+                    or (actual, vecino) in aristas_bloqueadas):
+                continue
+            nueva_dist = dist_actual + pesos.get(criterio, pesos['distancia'])
+            if nueva_dist < distancias.get(vecino, math.inf):
+                distancias[vecino] = nueva_dist
+                previos[vecino] = actual
+                heapq.heappush(
+                    cola, (nueva_dist + restante[vecino], nueva_dist, vecino))
+
+    return None
@@ -0,0 +1,78 @@
+"""
+ARCHIVO: models/rutas_pareto.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Búsqueda multiobjetivo por etiquetas (distancia, tiempo). Retorna
+             en una sola pasada todas las rutas no dominadas (frente de
+             Pareto) entre dos ciudades.
+DEPENDENCIAS: heapq, math
+"""
+
+import heapq
+import math
+
+# Máximo de etiquetas asentadas por ciudad (acota el costo en redes grandes)
+MAX_ETIQUETAS_POR_CIUDAD = 16
+
+
+def buscar_pareto(adyacencia, origen, destino,
+                  max_etiquetas=MAX_ETIQUETAS_POR_CIUDAD):
+    """Retorna (rutas, acotado) con las rutas no dominadas origen → destino.
+
+    Las etiquetas salen de la cola en orden lexicográfico (distancia,
+    tiempo): una etiqueta nueva en una ciudad solo es no dominada si su
+    tiempo es menor que el de todas las ya asentadas allí, lo que reduce
+    la prueba de dominancia a una comparación. 'acotado' indica si algún
+    límite de etiquetas descartó candidatos.
+    """
+    # Etiqueta: (distancia, tiempo, ciudad, índice de la etiqueta padre)
+    etiquetas = [(0, 0, origen, None)]
+    cola = [(0, 0, 0)]
+    mejor_tiempo = {}   # ciudad → menor tiempo entre sus etiquetas asentadas
+    asentadas = {}      # ciudad → cantidad de etiquetas asentadas
+    soluciones = []
+    acotado = False
+
+    while cola:
+        distancia, tiempo, indice = heapq.heappop(cola)
+        ciudad = etiquetas[indice][2]
+
+        # Dominada por una etiqueta asentada aquí o por una ruta ya hallada
+        if tiempo >= mejor_tiempo.get(ciudad, math.inf):
+            continue
+        if tiempo >= mejor_tiempo.get(destino, math.inf):
+            continue
+        if asentadas.get(ciudad, 0) >= max_etiquetas:
+            acotado = True
+            continue
+
+        mejor_tiempo[ciudad] = tiempo
+        asentadas[ciudad] = asentadas.get(ciudad, 0) + 1
+
+        if ciudad == destino:
+            soluciones.append(indice)
+            continue
+
+        limite_tiempo = mejor_tiempo.get(destino, math.inf)
+        for vecino, pesos in adyacencia[ciudad].items():
+            nuevo_tiempo = tiempo + pesos.get('tiempo', pesos['distancia'])
+            if nuevo_tiempo >= mejor_tiempo.get(vecino, math.inf):
+                continue
+            if nuevo_tiempo >= limite_tiempo:
+                continue
+            nueva_distancia = distancia + pesos['distancia']
+            etiquetas.append((nueva_distancia, nuevo_tiempo, vecino, indice))
+            heapq.heappush(
+                cola, (nueva_distancia, nuevo_tiempo, len(etiquetas) - 1))
+
+    rutas = []
+    for indice in soluciones:
+        distancia, tiempo, _, _ = etiquetas[indice]
+        camino = []
+        while indice is not None:
+            camino.append(etiquetas[indice][2])
+            indice = etiquetas[indice][3]
+        camino.reverse()
+        rutas.append({'camino': camino, 'distancia': distancia, 'tiempo': tiempo})
+
+    return rutas, acotado
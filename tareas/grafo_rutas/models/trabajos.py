@@ -0,0 +1,172 @@
+"""
+ARCHIVO: models/trabajos.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Trabajos asíncronos en un pool de procesos. El pool se crea una
+             sola vez; cada trabajo lleva la versión del grafo con la que se
+             encoló y la ruta de su copia serializada (un archivo temporal
+             por versión, borrado cuando ya no lo usa ningún trabajo). Cada
+             proceso carga una versión solo cuando cambia, ejecuta allí la
+             consulta pesada y el cliente consulta su estado por
+             identificador sin ocupar un hilo del servidor. El mismo pool
+             reparte también las partes de una consulta síncrona (repartir).
+DEPENDENCIAS: os, pickle, tempfile, threading, uuid, collections,
+              concurrent.futures.ProcessPoolExecutor
+"""
+
+import os
+import pickle
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as TiempoAgotado
+from concurrent.futures.process import BrokenProcessPool
+
+# Trabajos recordados (los terminados más antiguos se olvidan)
+MAX_TRABAJOS = 1000
+
+# Segundos máximos que una consulta de estado puede esperar el resultado
+ESPERA_MAXIMA = 60
+
+# Proceso trabajador: fabrica(grafo) y el contexto (versión, objeto) de la
+# última versión usada, que se reemplaza al llegar un trabajo de otra
+_fabrica = None
+_contexto = None
+
+
+def _inicializar(fabrica):
+    global _fabrica
+    _fabrica = fabrica
+
+
+def en_proceso_trabajador():
+    """True dentro de un proceso del pool: allí las consultas se resuelven
+    en el mismo proceso, sin anidar otro pool"""
+    return _fabrica is not None
+
+
+def _ejecutar(version, ruta, metodo, datos):
+    global _contexto
+    if _contexto is None or _contexto[0] != version:
+        _contexto = None  # liberar la versión anterior antes de cargar
+        with open(ruta, 'rb') as archivo:
+            _contexto = (version, _fabrica(pickle.load(archivo)))
+    return getattr(_contexto[1], metodo)(datos)
+
+
+class GestorTrabajos:
+    def __init__(self, fabrica, procesos=None):
+        # fabrica(grafo) crea en cada proceso el objeto cuyos métodos se
+        # ejecutan (el controlador, con la copia del grafo como modelo)
+        self.fabrica = fabrica
+        self.procesos = procesos or os.cpu_count() or 1
+        self._pool = None
+        self._directorio = None
+        self._version = None            # última versión encolada
+        self._instantaneas = {}         # versión → [ruta, trabajos sin terminar]
+        self._trabajos = OrderedDict()  # id → (futuro, versión, método)
+        # Reentrante: un futuro ya terminado ejecuta su callback al agregarlo
+        self._bloqueo = threading.RLock()
+
+    def enviar(self, grafo, metodo, datos):
+        """Encola metodo(datos) sobre la versión de 'grafo'; retorna el id.
+
+        El grafo se serializa una vez por versión; los trabajos de versiones
+        anteriores siguen usando la suya hasta terminar.
+        """
+        with self._bloqueo:
+            futuro = self._encolar(grafo, metodo, datos)
+            identificador = uuid.uuid4().hex
+            self._trabajos[identificador] = (futuro, grafo.version, metodo)
+            self._olvidar_terminados()
+            return identificador
+
+    def repartir(self, grafo, metodo, partes):
+        """Ejecuta metodo(datos) para cada elemento de 'partes' en el pool,
+        sobre la versión de 'grafo', y espera sus resultados (en orden).
+        Las partes no se registran como trabajos consultables."""
+        with self._bloqueo:
+            futuros = [self._encolar(grafo, metodo, datos) for datos in partes]
+        return [futuro.result() for futuro in futuros]
+
+    def _encolar(self, grafo, metodo, datos):
+        """Envía metodo(datos) al pool (creándolo si hace falta) y retorna
+        el futuro; se llama con el bloqueo tomado"""
+        if self._pool is None:
+            self._directorio = tempfile.TemporaryDirectory(prefix='grafo_trabajos_')
+            self._crear_pool()
+
+        version = grafo.version
+        if version not in self._instantaneas:
+            # Cada proceso reconstruye su propia copia (sin candados ni
+            # observadores heredados del servidor)
+            ruta = os.path.join(self._directorio.name, f"{version}.pickle")
+            with open(ruta, 'wb') as archivo:
+                pickle.dump(grafo, archivo, pickle.HIGHEST_PROTOCOL)
+            self._instantaneas[version] = [ruta, 0]
+        if self._version is None or version > self._version:
+            self._version = version
+        ruta = self._instantaneas[version][0]
+
+        try:
+            futuro = self._pool.submit(_ejecutar, version, ruta, metodo, datos)
+        except BrokenProcessPool:
+            # Un proceso terminó de forma abrupta: pool nuevo
+            self._crear_pool()
+            futuro = self._pool.submit(_ejecutar, version, ruta, metodo, datos)
+        self._instantaneas[version][1] += 1
+        futuro.add_done_callback(lambda _: self._liberar(version))
+        return futuro
+
+    def _crear_pool(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+        self._pool = ProcessPoolExecutor(
+            self.procesos, initializer=_inicializar, initargs=(self.fabrica,))
+
+    def _liberar(self, version):
+        """Un trabajo de 'version' terminó: borra los archivos de versiones
+        anteriores que ya no usa ningún trabajo"""
+        with self._bloqueo:
+            self._instantaneas[version][1] -= 1
+            for anterior, (ruta, pendientes) in list(self._instantaneas.items()):
+                if anterior != self._version and pendientes == 0:
+                    os.remove(ruta)
+                    del self._instantaneas[anterior]
+
+    def consultar(self, identificador, espera=0):
+        """Estado del trabajo (esperando hasta 'espera' segundos a que
+        termine), o None si no existe"""
+        with self._bloqueo:
+            trabajo = self._trabajos.get(identificador)
+        if trabajo is None:
+            return None
+
+        futuro, version, metodo = trabajo
+        try:
+            futuro.exception(timeout=min(espera, ESPERA_MAXIMA))
+        except TiempoAgotado:
+            pass
+
+        estado = {'id': identificador, 'metodo': metodo, 'version': version}
+        if not futuro.done():
+            estado['estado'] = 'en_curso' if futuro.running() else 'pendiente'
+        elif futuro.exception() is not None:
+            estado['estado'] = 'error'
+            estado['mensaje'] = str(futuro.exception())
+        else:
+            estado['estado'] = 'completado'
+            estado['resultado'] = futuro.result()
+        return estado
+
+    def _olvidar_terminados(self):
+        """Descarta los trabajos terminados más antiguos sobre el límite"""
+        exceso = len(self._trabajos) - MAX_TRABAJOS
+        for identificador in list(self._trabajos):
+            if exceso <= 0:
+                break
+            if self._trabajos[identificador][0].done():
+                del self._trabajos[identificador]
+                exceso -= 1
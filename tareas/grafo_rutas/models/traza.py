@@ -0,0 +1,82 @@
+"""
+ARCHIVO: models/traza.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Destinos para la traza de búsqueda ('visitando'/'actualizando').
+             La traza es opcional: completa, muestreada o enviada en bloques a
+             una cola para transmitirla como NDJSON sin materializarla entera.
+DEPENDENCIAS: Ninguna
+"""
+
+# Modos de traza aceptados por GrafoRutas.dijkstra y /api/ruta
+MODOS_TRAZA = ('none', 'sampled', 'full')
+
+# En modo 'sampled' se conserva uno de cada INTERVALO_MUESTREO pasos
+INTERVALO_MUESTREO = 10
+
+# Pasos por bloque al transmitir la traza
+TAM_BLOQUE = 500
+
+
+class TrazaMuestreada:
+    """Lista de pasos que conserva solo uno de cada 'intervalo'"""
+
+    def __init__(self, intervalo=INTERVALO_MUESTREO):
+        self.intervalo = intervalo
+        self.pasos = []
+        self._contador = 0
+
+    def append(self, paso):
+        if self._contador % self.intervalo == 0:
+            self.pasos.append(paso)
+        self._contador += 1
+
+
+class TrazaEnFlujo:
+    """Agrupa los pasos en bloques y los entrega a una cola acotada.
+
+    Con una cola de tamaño máximo el productor espera al consumidor, así la
+    memoria usada no depende del largo de la traza.
+    """
+
+    def __init__(self, cola, intervalo=1, tam_bloque=TAM_BLOQUE, espera=30):
+        self.cola = cola
+        self.intervalo = intervalo
+        self.tam_bloque = tam_bloque
+        self.espera = espera
+        self.pasos = []  # Siempre vacía: los pasos salen por la cola
+        self._bloque = []
+        self._contador = 0
+
+    def append(self, paso):
+        if self._contador % self.intervalo == 0:
+            self._bloque.append(paso)
+            if len(self._bloque) >= self.tam_bloque:
+                self.vaciar()
+        self._contador += 1
+
+    def vaciar(self):
+        """Envía el bloque pendiente (lanza queue.Full si nadie consume)"""
+        if self._bloque:
+            self.cola.put({'pasos': self._bloque}, timeout=self.espera)
+            self._bloque = []
+
+
+def crear_traza(modo):
+    """Retorna el destino de pasos para un modo (None = sin traza)"""
+    if modo == 'none':
+        return None
+    if modo == 'full':
+        return []
+    if modo == 'sampled':
+        return TrazaMuestreada()
+    raise ValueError(f"Modo de traza {modo} no soportado")
+
+
+def pasos_de(traza):
+    """Lista de pasos registrados por un destino de traza"""
+    if traza is None:
+        return []
+    if isinstance(traza, list):
+        return traza
+    return traza.pasos
@@ -6,31 +6,97 @@ DESCRIPCIÓN: Define endpoints REST API para comunicación frontend-backend.
              Maneja requests de mapa, rutas y ciudades.
 """
 
+import io
+import json
+import os
+import queue
+import threading
+
 import markdown
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, jsonify, request
 from controllers.mapa_controller import MapaController
 from models.grafo_rutas import GrafoRutas
+from models.importador import formato_de
+from models.traza import INTERVALO_MUESTREO, MODOS_TRAZA, TrazaEnFlujo
+
+# Segundos sin eventos tras los que /api/eventos envía un comentario de
+# mantenimiento (evita que proxies cierren la conexión)
+ESPERA_EVENTOS = 15
 
 # Crear blueprint
 api_bp = Blueprint('api', __name__)
 
-# Inicializar controlador (UNA SOLA INSTANCIA)
-controlador = MapaController()
+# Inicializar controlador (UNA SOLA INSTANCIA); con GRAFO_RUTAS_ARCHIVO el
+# mapa se carga de esa instantánea binaria y los cambios se guardan allí
+controlador = MapaController(archivo=os.environ.get('GRAFO_RUTAS_ARCHIVO'))
 
 
 @api_bp.route('/mapa')
 def obtener_mapa():
-    """Obtiene datos a través del Controlador"""
-    try:
-        datos_mapa = controlador.obtener_mapa()
-        print(
-            f"🔍 DEBUG - /api/mapa enviando: {len(datos_mapa['ciudades'])} ciudades")
+    """Obtiene datos a través del Controlador.
+
+    Con xmin, ymin, xmax, ymax (y opcionalmente zoom) retorna solo las
+    ciudades y rutas dentro de esa vista; con desde=<versión>, solo los
+    cambios posteriores. El mapa completo lleva ETag y X-Version-Grafo.
+    """
+    if 'desde' in request.args:
+        resultado = controlador.obtener_cambios(request.args['desde'])
+        if resultado['status'] == 'error':
+            return jsonify(resultado), 400
+        return jsonify(resultado)
+
+    if any(campo in request.args for campo in ('xmin', 'ymin', 'xmax', 'ymax')):
+        datos_mapa = controlador.obtener_mapa_en_vista(request.args.to_dict())
+        if datos_mapa.get('status') == 'error':
+            return jsonify(datos_mapa), 400
         return jsonify(datos_mapa)
+
+    try:
+        # JSON ya serializado por versión; If-None-Match coincidente → 304
+        cuerpo, etag, version = controlador.obtener_mapa_serializado()
+        respuesta = Response(cuerpo, mimetype='application/json')
+        respuesta.set_etag(etag)
+        respuesta.headers['Cache-Control'] = 'no-cache'
+        respuesta.headers['X-Version-Grafo'] = str(version)
+        return respuesta.make_conditional(request)
     except Exception as e:
         print(f"❌ Error en /api/mapa: {e}")
         return jsonify({'status': 'error', 'message': str(e)})
 
 
+@api_bp.route('/eventos')
+def eventos_mapa():
+    """Flujo SSE con los cambios del grafo a partir de una versión.
+
+    La versión inicial es ?desde=<versión> o la cabecera Last-Event-ID que
+    el navegador reenvía al reconectarse. Si el diario ya no cubre esa
+    versión se emite un evento 'recargar' (el cliente pide el mapa completo).
+    """
+    desde = request.headers.get('Last-Event-ID') or request.args.get('desde')
+    valido, _ = controlador.vista.validar_version(desde)
+    version = int(desde) if valido else controlador.eventos.version
+    vista = controlador.vista
+    diario = controlador.eventos
+
+    def generar():
+        ultima = version
+        while True:
+            eventos = diario.esperar(ultima, ESPERA_EVENTOS)
+            if eventos is None:
+                ultima = diario.version
+                yield vista.formatear_evento_sse(
+                    {'tipo': 'recargar', 'version': ultima})
+            elif not eventos:
+                yield ": sin cambios\n\n"
+            for evento in eventos or []:
+                ultima = evento['version']
+                yield vista.formatear_evento_sse(evento)
+
+    return Response(generar(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache',
+                             'X-Accel-Buffering': 'no'})
+
+
 @api_bp.route('/ruta', methods=['POST'])
 def calcular_ruta():
     try:
@@ -38,40 +104,45 @@ def calcular_ruta():
         origen = datos.get('origen')
         destino = datos.get('destino')
         intermedio = datos.get('intermedio')
+        intermedios = datos.get('intermedios') or []
+        optimizar = bool(datos.get('optimizar', False))
         criterio = datos.get('criterio', 'distancia')
+        algoritmo = datos.get('algoritmo', 'dijkstra')
+        modo_traza = datos.get('trace', 'none')
 
         if not origen or not destino:
             return jsonify({'error': 'Origen y destino requeridos'}), 400
 
-        grafo = controlador.obtener_grafo()
-
-        # ✅ CALCULAR RUTA CON/SIN PUNTO INTERMEDIO
-        if intermedio:
-            # Origen → Intermedio → Destino
-            ruta1 = grafo.dijkstra(origen, intermedio, criterio)
-            ruta2 = grafo.dijkstra(intermedio, destino, criterio)
-
-            # COMBINAR RUTAS
-            camino_completo = ruta1['camino'][:-1] + \
-                ruta2['camino']  # Evitar duplicar intermedio
-            distancia_total = ruta1['distancia'] + ruta2['distancia']
-            pasos_combinados = ruta1['pasos'] + ruta2['pasos']
-
-            resultado = {
-                'camino': camino_completo,
-                'distancia': distancia_total,
-                'pasos': pasos_combinados
-            }
-        else:
-            # RUTA DIRECTA
-            resultado = grafo.dijkstra(origen, destino, criterio)
-
-        return jsonify({
-            'camino': resultado['camino'],
-            'distancia': resultado['distancia'],
-            'pasos': resultado['pasos'],
-            'criterio': criterio
-        })
+        # La consulta completa (y su clave de caché) usa una sola versión
+        grafo = controlador.obtener_instantanea()
+
+        valido, error = controlador.vista.validar_datos_ruta_calculo(datos)
+        if not valido:
+            return jsonify({'error': error}), 400
+        # Hora de salida normalizada (ValueError → 400): "07:30" y 7.5 comparten clave
+        salida = controlador.vista.leer_salida(datos.get('salida'))
+        if modo_traza not in MODOS_TRAZA:
+            return jsonify({'error': 'trace debe ser full, sampled o none'}), 400
+
+        # ✅ ASÍNCRONO: se encola en el pool de procesos y se responde el id
+        if _es_asincrono(datos):
+            return _responder_trabajo(
+                controlador.enviar_trabajo('resolver_ruta', datos))
+
+        # ✅ ANIMACIÓN: la traza se transmite en bloques NDJSON
+        if modo_traza != 'none':
+            intervalo = INTERVALO_MUESTREO if modo_traza == 'sampled' else 1
+            return _transmitir_traza(
+                lambda traza: controlador.resolver_ruta(datos, grafo, traza),
+                intervalo)
+
+        # ✅ CACHÉ LRU: se invalida cuando cambia la versión del grafo
+        clave = (origen, destino, intermedio, tuple(intermedios), optimizar,
+                 criterio, algoritmo, salida)
+        resultado = controlador.cache_rutas.obtener(
+            clave, grafo.version, lambda: controlador.resolver_ruta(datos, grafo))
+
+        return jsonify({**resultado, 'pasos': []})
 
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
@@ -80,6 +151,192 @@ def calcular_ruta():
         return jsonify({'error': 'Error interno del servidor'}), 500
 
 
+def _es_asincrono(datos=None):
+    """async=true en la URL o en el cuerpo JSON"""
+    valor = request.args.get('async', (datos or {}).get('async', False))
+    return str(valor).lower() in ('true', '1')
+
+
+def _responder_trabajo(resultado):
+    """202 con el id del trabajo encolado (400 si no se pudo encolar)"""
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado), 202
+
+
+@api_bp.route('/trabajos/<identificador>')
+def consultar_trabajo(identificador):
+    """Estado y resultado de un trabajo asíncrono.
+
+    Con ?esperar=<segundos> la respuesta espera a que termine (máx. 60 s).
+    """
+    espera = request.args.get('esperar', 0)
+    valido, error = controlador.vista.validar_espera(espera)
+    if not valido:
+        return jsonify(controlador.vista.formatear_error(error)), 400
+
+    resultado = controlador.consultar_trabajo(identificador, espera)
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 404
+
+    # Una matriz .npy terminada se entrega en binario, como /api/matriz
+    final = resultado.get('resultado')
+    if isinstance(final, dict) and final.get('formato') == 'npy':
+        return _responder_matriz(final)
+    return jsonify(resultado)
+
+
+def _transmitir_traza(calcular, intervalo):
+    """Ejecuta calcular(traza) en un hilo y transmite NDJSON.
+
+    Cada línea es un bloque {"pasos": [...]}; la última es el resultado
+    (o {"error": ...}). La cola acotada limita la memoria: la búsqueda
+    espera mientras el cliente no consume.
+    """
+    cola = queue.Queue(maxsize=8)
+    traza = TrazaEnFlujo(cola, intervalo)
+
+    def trabajar():
+        try:
+            resultado = calcular(traza)
+            traza.vaciar()
+            cola.put(resultado, timeout=traza.espera)
+        except queue.Full:
+            return  # El cliente dejó de leer
+        except ValueError as e:
+            cola.put({'error': str(e)})
+        except Exception as e:
+            print(f"❌ Error en traza de /api/ruta: {e}")
+            cola.put({'error': 'Error interno del servidor'})
+        cola.put(None)
+
+    threading.Thread(target=trabajar, daemon=True).start()
+
+    # Si falla antes del primer bloque se responde como error normal
+    primero = cola.get()
+    if 'error' in primero:
+        return jsonify(primero), 400
+
+    def generar():
+        elemento = primero
+        while elemento is not None:
+            yield json.dumps(elemento, ensure_ascii=False) + '\n'
+            elemento = cola.get()
+
+    return Response(generar(), mimetype='application/x-ndjson')
+
+
+@api_bp.route('/ruta/pareto', methods=['POST'])
+def calcular_rutas_pareto():
+    """Todas las rutas no dominadas en distancia y tiempo"""
+    datos = request.get_json(silent=True) or {}
+    if _es_asincrono(datos):
+        return _responder_trabajo(controlador.enviar_trabajo('calcular_pareto', datos))
+    resultado = controlador.calcular_pareto(datos)
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/rutas/alternativas')
+def rutas_alternativas():
+    """Top-k rutas sin ciclos (Yen) sin modificar el grafo"""
+    if _es_asincrono():
+        return _responder_trabajo(controlador.enviar_trabajo(
+            'calcular_alternativas', request.args.to_dict()))
+    resultado = controlador.calcular_alternativas(request.args.to_dict())
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/alcance')
+def alcance():
+    """Ciudades alcanzables desde un origen dentro de un presupuesto"""
+    resultado = controlador.calcular_alcance(request.args.to_dict())
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/ciudades/cercanas')
+def ciudades_cercanas():
+    """Las k ciudades más cercanas a un punto (x, y)"""
+    resultado = controlador.buscar_cercanas(request.args.to_dict())
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/ciudades/rectangulo')
+def ciudades_en_rectangulo():
+    """Ciudades dentro del rectángulo xmin, ymin, xmax, ymax"""
+    resultado = controlador.buscar_en_rectangulo(request.args.to_dict())
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/rutas/lote', methods=['POST'])
+def calcular_rutas_lote():
+    """Calcula muchas rutas en una sola petición (agrupadas por origen)"""
+    datos = request.get_json(silent=True)
+    if not datos:
+        return jsonify({'status': 'error', 'message': 'No se recibieron datos JSON'}), 400
+
+    if _es_asincrono(datos):
+        return _responder_trabajo(controlador.enviar_trabajo('calcular_lote', datos))
+    resultado = controlador.calcular_lote(datos)
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/matriz', methods=['GET', 'POST'])
+def matriz_costos():
+    """Matrices N×N de distancia/tiempo (JSON o binario .npy)"""
+    if request.method == 'POST':
+        datos = request.get_json(silent=True) or {}
+    else:
+        ciudades = request.args.get('ciudades')
+        datos = {
+            'ciudades': ciudades.split(',') if ciudades else None,
+            'criterio': request.args.get('criterio'),
+            'formato': request.args.get('formato')
+        }
+
+    if _es_asincrono(datos):
+        return _responder_trabajo(controlador.enviar_trabajo('calcular_matriz', datos))
+
+    resultado = controlador.calcular_matriz(datos)
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return _responder_matriz(resultado)
+
+
+def _responder_matriz(resultado):
+    """JSON o binario .npy según el formato pedido"""
+    if resultado.get('formato') == 'npy':
+        return Response(
+            resultado['contenido'],
+            mimetype='application/octet-stream',
+            headers={
+                'Content-Disposition': 'attachment; filename=matriz.npy',
+                'X-Ciudades': resultado['ciudades'],
+                'X-Criterios': resultado['criterios']
+            })
+    return jsonify(resultado)
+
+
+@api_bp.route('/cache')
+def estadisticas_cache():
+    """Aciertos y fallos de la caché de rutas y de árboles de caminos"""
+    return jsonify({
+        'rutas': controlador.cache_rutas.estadisticas(),
+        'arboles': controlador.obtener_grafo().arboles.estadisticas()
+    })
+
+
 @api_bp.route('/ciudad', methods=['POST'])
 def agregar_ciudad():
     """Agrega una nueva ciudad a través del Controlador"""
@@ -175,6 +432,51 @@ def eliminar_ruta():
         return jsonify({'status': 'error', 'message': str(e)})
 
 
+@api_bp.route('/ruta/perfil', methods=['PUT'])
+def asignar_perfil():
+    """Asigna a una ruta un perfil de tiempo: {ciudad1, ciudad2, horas, tiempos}"""
+    datos = request.get_json(silent=True) or {}
+    resultado = controlador.asignar_perfil(datos)
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/ruta/perfil', methods=['DELETE'])
+def quitar_perfil():
+    """Quita el perfil de tiempo de una ruta"""
+    datos = request.get_json(silent=True) or {}
+    ciudad1 = (datos.get('ciudad1') or '').strip()
+    ciudad2 = (datos.get('ciudad2') or '').strip()
+    if not ciudad1 or not ciudad2:
+        return jsonify({'status': 'error', 'message': 'ciudad1 y ciudad2 son requeridos'}), 400
+
+    resultado = controlador.quitar_perfil(ciudad1, ciudad2)
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
+@api_bp.route('/importar', methods=['POST'])
+def importar_mapa():
+    """Reemplaza el mapa con archivos CSV, NDJSON o GeoJSON.
+
+    Multipart con uno o más archivos en el campo 'archivos' (en orden: las
+    ciudades antes que las rutas que las usan); el formato se deduce de la
+    extensión o del campo 'formato'. Los archivos se leen en flujo.
+    """
+    formato = request.form.get('formato')
+    fuentes = [
+        (io.TextIOWrapper(archivo.stream, encoding='utf-8', newline=''),
+         formato or formato_de(archivo.filename))
+        for archivo in request.files.getlist('archivos')
+    ]
+    resultado = controlador.importar_mapa(fuentes)
+    if resultado['status'] == 'error':
+        return jsonify(resultado), 400
+    return jsonify(resultado)
+
+
 @api_bp.route('/documentacion')
 def documentacion():
     try:
@@ -12,12 +12,14 @@ class SistemaRutas {
         this.conexiones = [];
         this.pesos = {};
         this.criterioActual = 'distancia';
+        this.version = null;     // Versión del grafo de los datos locales
+        this.eventos = null;     // EventSource de /api/eventos
         
         this.actualizarEstado("Inicializando...");
         this.configurarFormularios();
         this.configurarClicksMapa(); 
         this.configurarCriterios();
-        this.cargarMapa();
+        this.cargarMapa().then(() => this.conectarEventos());
     }
 
     // ==================== MÉTODOS DE LIMPIEZA AUTOMÁTICA ====================
@@ -117,6 +119,7 @@ class SistemaRutas {
             
             const data = await response.json();
             
+            this.version = Number(response.headers.get('X-Version-Grafo'));
             this.ciudades = data.ciudades || {};
             this.conexiones = data.conexiones || [];
             this.pesos = data.pesos || {};
@@ -141,6 +144,75 @@ class SistemaRutas {
         }
     }
 
+    async sincronizarMapa() {
+        /* Tras una modificación: si el flujo de eventos está abierto el
+           cambio llega por ahí; si no, se recarga el mapa completo */
+        if (this.eventos && this.eventos.readyState === EventSource.OPEN) {
+            return;
+        }
+        await this.cargarMapa();
+    }
+
+    conectarEventos() {
+        /* Cambios del grafo por SSE: cada evento modifica el estado local
+           sin volver a descargar /api/mapa */
+        if (!window.EventSource || this.version === null) {
+            return;
+        }
+        // Al reconectarse el navegador envía Last-Event-ID (última versión)
+        this.eventos = new EventSource(`/api/eventos?desde=${this.version}`);
+        this.eventos.onmessage = (mensaje) => this.aplicarEvento(JSON.parse(mensaje.data));
+    }
+
+    aplicarEvento(evento) {
+        // Antes de comparar versiones: tras reiniciar el servidor la versión
+        // vuelve a empezar y 'recargar' llega con una menor que la local;
+        // cargarMapa toma la versión nueva de la respuesta
+        if (evento.tipo === 'recargar' || evento.tipo === 'mapa_cargado') {
+            this.cargarMapa();
+            return;
+        }
+        if (evento.version <= this.version) {
+            return;
+        }
+
+        const quitarRuta = (c1, c2) => {
+            this.conexiones = this.conexiones.filter(([a, b]) =>
+                !((a === c1 && b === c2) || (a === c2 && b === c1)));
+            delete this.pesos[`${c1}-${c2}`];
+            delete this.pesos[`${c2}-${c1}`];
+        };
+
+        switch (evento.tipo) {
+            case 'ciudad_agregada':
+                this.ciudades[evento.nombre] = [evento.x, evento.y];
+                break;
+            case 'ciudad_eliminada':
+                delete this.ciudades[evento.nombre];
+                this.conexiones
+                    .filter(([a, b]) => a === evento.nombre || b === evento.nombre)
+                    .forEach(([a, b]) => quitarRuta(a, b));
+                break;
+            case 'ruta_agregada':
+                quitarRuta(evento.ciudad1, evento.ciudad2);
+                this.conexiones.push([evento.ciudad1, evento.ciudad2]);
+                this.conexiones.push([evento.ciudad2, evento.ciudad1]);
+                this.pesos[`${evento.ciudad1}-${evento.ciudad2}`] = evento.pesos;
+                this.pesos[`${evento.ciudad2}-${evento.ciudad1}`] = evento.pesos;
+                break;
+            case 'ruta_eliminada':
+                quitarRuta(evento.ciudad1, evento.ciudad2);
+                break;
+        }
+        this.version = evento.version;
+
+        this.actualizarContadores();
+        this.actualizarSelects();
+        this.mostrarListaCiudades();
+        this.mostrarListaRutas();
+        this.dibujarMapa();
+    }
+
     actualizarSelects() {
         const origen = document.getElementById('origen');
         const intermedio = document.getElementById('intermedio');
@@ -191,7 +263,7 @@ class SistemaRutas {
 
             if (resultado.status === 'ok') {
                 document.getElementById('form-ciudad').reset();
-                await this.cargarMapa();
+                await this.sincronizarMapa();
                 this.actualizarEstado("Ciudad agregada correctamente");
             } else {
                 alert('Error: ' + resultado.message);
@@ -224,7 +296,7 @@ class SistemaRutas {
             const resultado = await response.json();
 
             if (resultado.status === 'ok') {
-                await this.cargarMapa();
+                await this.sincronizarMapa();
                 this.actualizarEstado("Ciudad eliminada correctamente");
             } else {
                 alert('Error: ' + resultado.message);
@@ -278,7 +350,7 @@ class SistemaRutas {
 
             if (resultado.status === 'ok') {
                 document.getElementById('form-ruta').reset();
-                await this.cargarMapa();
+                await this.sincronizarMapa();
                 this.actualizarEstado("Ruta agregada correctamente");
             } else {
                 alert('Error: ' + resultado.message);
@@ -311,7 +383,7 @@ class SistemaRutas {
             const resultado = await response.json();
 
             if (resultado.status === 'ok') {
-                await this.cargarMapa();
+                await this.sincronizarMapa();
                 this.actualizarEstado("Ruta eliminada correctamente");
             } else {
                 alert('Error: ' + resultado.message);
@@ -363,7 +435,8 @@ class SistemaRutas {
                     origen, 
                     intermedio: tieneIntermedio ? intermedio : null,
                     destino, 
-                    criterio: this.criterioActual
+                    criterio: this.criterioActual,
+                    trace: 'full'
                 })
             });
 
@@ -371,7 +444,7 @@ class SistemaRutas {
                 throw new Error(`Error del servidor: ${response.status}`);
             }
 
-            const data = await response.json();
+            const data = await this.leerRespuestaRuta(response);
             
             if (data.error) {
                 document.getElementById('resultado').innerHTML = 
@@ -392,6 +465,42 @@ class SistemaRutas {
         }
     }
 
+    async leerRespuestaRuta(response) {
+        /* Con traza, la respuesta es NDJSON: bloques {pasos} y al final el resultado */
+        const tipo = response.headers.get('Content-Type') || '';
+        if (!tipo.includes('application/x-ndjson')) {
+            return await response.json();
+        }
+
+        const lector = response.body.getReader();
+        const decodificador = new TextDecoder();
+        const pasos = [];
+        let resultado = {};
+        let pendiente = '';
+
+        const procesarLinea = (linea) => {
+            if (!linea.trim()) return;
+            const objeto = JSON.parse(linea);
+            if (objeto.pasos) {
+                objeto.pasos.forEach(paso => pasos.push(paso));
+            } else {
+                resultado = objeto;
+            }
+        };
+
+        while (true) {
+            const { done, value } = await lector.read();
+            if (done) break;
+            pendiente += decodificador.decode(value, { stream: true });
+            const lineas = pendiente.split('\n');
+            pendiente = lineas.pop();
+            lineas.forEach(procesarLinea);
+        }
+        procesarLinea(pendiente);
+
+        return { ...resultado, pasos };
+    }
+
     mostrarResultado(data, tieneIntermedio = false) {
         console.log("Datos recibidos:", data);
         const resultadoDiv = document.getElementById('resultado');
@@ -718,7 +827,7 @@ class SistemaRutas {
             const resultado = await response.json();
 
             if (resultado.status === 'ok') {
-                await this.cargarMapa();
+                await this.sincronizarMapa();
                 this.actualizarEstado(`Ciudad "${nombre}" agregada correctamente`);
             } else {
                 alert('Error: ' + resultado.message);
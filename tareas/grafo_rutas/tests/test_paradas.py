@@ -0,0 +1,53 @@
+"""
+ARCHIVO: tests/test_paradas.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Pruebas de GrafoRutas.ruta_con_paradas: orden óptimo de las
+             paradas y error de validación (no AssertionError) cuando una
+             parada no es alcanzable.
+             Ejecutar desde tareas/grafo_rutas: python -m unittest
+DEPENDENCIAS: unittest, models.grafo_rutas
+"""
+
+import unittest
+
+from models.grafo_rutas import GrafoRutas
+
+
+def grafo_en_linea(n):
+    """Ciudades C0..C(n-1) sobre una recta, unidas en cadena"""
+    grafo = GrafoRutas()
+    for i in range(n):
+        grafo.agregar_ciudad(f'C{i}', i * 10, 0)
+    for i in range(n - 1):
+        grafo.agregar_ruta(f'C{i}', f'C{i + 1}', {'distancia': 10, 'tiempo': 1})
+    return grafo
+
+
+class TestRutaConParadas(unittest.TestCase):
+    def test_optimizar_ordena_las_paradas(self):
+        grafo = grafo_en_linea(5)
+        resultado = grafo.ruta_con_paradas('C0', 'C4', ['C3', 'C1'], optimizar=True)
+        self.assertEqual(resultado['orden'], ['C1', 'C3'])
+        self.assertEqual(resultado['camino'], ['C0', 'C1', 'C2', 'C3', 'C4'])
+        self.assertEqual(resultado['distancia'], 40)
+
+    def test_parada_inalcanzable(self):
+        grafo = grafo_en_linea(4)
+        grafo.agregar_ciudad('Aislada', 100, 100)
+        for optimizar in (False, True):
+            with self.assertRaisesRegex(ValueError, 'No hay camino'):
+                grafo.ruta_con_paradas('C0', 'C3', ['C1', 'Aislada', 'C2'],
+                                       optimizar=optimizar)
+
+    def test_parada_inalcanzable_con_muchas_paradas(self):
+        # Más paradas que el límite exacto: vecino más cercano + 2-opt
+        grafo = grafo_en_linea(15)
+        grafo.agregar_ciudad('Aislada', 100, 100)
+        paradas = [f'C{i}' for i in range(1, 14)] + ['Aislada']
+        with self.assertRaisesRegex(ValueError, 'No hay camino'):
+            grafo.ruta_con_paradas('C0', 'C14', paradas, optimizar=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+ARCHIVO: tests/test_validaciones.py
+AUTOR: Lorgio Añez J.
+FECHA: 2026-10-18
+DESCRIPCIÓN: Pruebas de las validaciones de entrada de la vista: los valores
+             no finitos (inf, nan) se rechazan con un mensaje propio.
+             Ejecutar desde tareas/grafo_rutas: python -m unittest
+DEPENDENCIAS: unittest, views.mapa_view
+"""
+
+import unittest
+
+from views.mapa_view import MapaView
+
+
+class TestCercanasRectangulo(unittest.TestCase):
+    def test_cercanas_rechaza_no_finitos(self):
+        for x, y in (('inf', '0'), ('0', '-inf'), ('nan', '1')):
+            valido, error = MapaView.validar_datos_cercanas({'x': x, 'y': y})
+            self.assertFalse(valido)
+            self.assertEqual(error, "x e y deben ser números finitos")
+
+    def test_cercanas_acepta_punto_finito(self):
+        self.assertEqual(
+            MapaView.validar_datos_cercanas({'x': '10.5', 'y': '-3', 'k': '2'}),
+            (True, None))
+
+    def test_rectangulo_rechaza_no_finitos(self):
+        datos = {'xmin': '0', 'ymin': '0', 'xmax': 'inf', 'ymax': '10'}
+        valido, error = MapaView.validar_datos_rectangulo(datos)
+        self.assertFalse(valido)
+        self.assertEqual(error, "xmin, ymin, xmax, ymax deben ser números finitos")
+
+        datos = {'xmin': 'nan', 'ymin': '0', 'xmax': '5', 'ymax': '10'}
+        self.assertFalse(MapaView.validar_datos_rectangulo(datos)[0])
+
+    def test_rectangulo_acepta_limites_finitos(self):
+        datos = {'xmin': '0', 'ymin': '0', 'xmax': '5', 'ymax': '10'}
+        self.assertEqual(MapaView.validar_datos_rectangulo(datos), (True, None))
+
+
+class TestVista(unittest.TestCase):
+    VISTA = {'xmin': '0', 'ymin': '0', 'xmax': '500', 'ymax': '500'}
+
+    def test_vista_rechaza_limites_no_finitos(self):
+        for campo in ('xmin', 'ymax'):
+            for valor in ('inf', '-inf', 'nan'):
+                datos = {**self.VISTA, campo: valor}
+                valido, error = MapaView.validar_datos_vista(datos)
+                self.assertFalse(valido, datos)
+                self.assertEqual(error, "xmin, ymin, xmax, ymax deben ser números finitos")
+
+    def test_vista_rechaza_zoom_no_finito(self):
+        for zoom in ('inf', 'nan'):
+            valido, error = MapaView.validar_datos_vista({**self.VISTA, 'zoom': zoom})
+            self.assertFalse(valido)
+            self.assertEqual(error, "El zoom debe ser un número finito")
+
+    def test_vista_acepta_limites_y_zoom_finitos(self):
+        self.assertEqual(MapaView.validar_datos_vista({**self.VISTA, 'zoom': '2.5'}),
+                         (True, None))
+
+
+if __name__ == '__main__':
+    unittest.main()
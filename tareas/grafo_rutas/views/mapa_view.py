@@ -4,9 +4,31 @@ AUTOR: Lorgio Añez J.
 FECHA: 2025-10-23
 DESCRIPCIÓN: Formatea datos para frontend y valida entradas.
              Serializa respuestas JSON y maneja validaciones.
-DEPENDENCIAS: Ninguna
+DEPENDENCIAS: array, json, math, sys (serialización .npy sin NumPy)
 """
 
+import array
+import json
+import math
+import sys
+
+# Máximo de pares origen/destino aceptados en un lote
+MAX_PARES_LOTE = 10000
+
+# Máximo de ciudades por matriz de costos (N×N valores por criterio)
+MAX_CIUDADES_MATRIZ = 2000
+
+CRITERIOS = ('distancia', 'tiempo')
+
+# Máximo de rutas alternativas por consulta
+MAX_ALTERNATIVAS = 20
+
+# Máximo de ciudades cercanas por consulta
+MAX_CERCANAS = 100
+
+# Formatos aceptados por /api/importar (ver models.importador)
+FORMATOS_IMPORTACION = ('csv', 'ndjson', 'geojson')
+
 
 class MapaView:
     @staticmethod
@@ -18,6 +40,61 @@ class MapaView:
             'pesos': datos_modelo['pesos']
         }
 
+    @staticmethod
+    def serializar_mapa(datos_mapa):
+        """Serializa los datos del mapa a JSON compacto (bytes UTF-8)"""
+        return json.dumps(datos_mapa, ensure_ascii=False,
+                          separators=(',', ':')).encode('utf-8')
+
+    @staticmethod
+    def validar_version(version):
+        """Valida una versión del grafo recibida como texto"""
+        try:
+            if int(version) < 0:
+                return False, "La versión debe ser positiva"
+        except (TypeError, ValueError):
+            return False, "La versión debe ser un entero"
+        return True, None
+
+    @staticmethod
+    def formatear_cambios(version, eventos, mapa=None):
+        """Eventos para ponerse al día, o el mapa completo si no alcanzan"""
+        if eventos is None:
+            return {'status': 'success', 'version': version,
+                    'completo': True, 'mapa': mapa}
+        return {'status': 'success', 'version': version,
+                'completo': False, 'eventos': eventos}
+
+    @staticmethod
+    def formatear_evento_sse(evento):
+        """Un evento del diario en formato text/event-stream"""
+        return (f"id: {evento['version']}\n"
+                f"data: {json.dumps(evento, ensure_ascii=False)}\n\n")
+
+    @staticmethod
+    def validar_datos_vista(datos):
+        """Valida el rectángulo de vista (xmin, ymin, xmax, ymax) y el zoom"""
+        try:
+            xmin, ymin, xmax, ymax = (
+                float(datos.get(campo, ''))
+                for campo in ('xmin', 'ymin', 'xmax', 'ymax'))
+        except ValueError:
+            return False, "xmin, ymin, xmax, ymax deben ser números"
+        if not all(map(math.isfinite, (xmin, ymin, xmax, ymax))):
+            return False, "xmin, ymin, xmax, ymax deben ser números finitos"
+        if xmin > xmax or ymin > ymax:
+            return False, "Rectángulo inválido: el mínimo supera al máximo"
+        if datos.get('zoom') is not None:
+            try:
+                zoom = float(datos['zoom'])
+            except ValueError:
+                return False, "El zoom debe ser un número"
+            if not math.isfinite(zoom):
+                return False, "El zoom debe ser un número finito"
+            if not zoom > 0:
+                return False, "El zoom debe ser positivo"
+        return True, None
+
     @staticmethod
     def formatear_respuesta_ruta(resultado_dijkstra):
         """Formatea la respuesta del algoritmo para el frontend"""
@@ -28,6 +105,15 @@ class MapaView:
             'pasos': resultado_dijkstra['pasos']
         }
 
+    @staticmethod
+    def formatear_respuesta_pareto(resultado):
+        """Formatea el frente de rutas no dominadas distancia/tiempo"""
+        return {
+            'status': 'success',
+            'rutas': resultado['rutas'],
+            'acotado': resultado['acotado']
+        }
+
     @staticmethod
     def formatear_error(mensaje):
         """Formatea mensajes de error"""
@@ -81,7 +167,294 @@ class MapaView:
 
     @staticmethod
     def validar_datos_ruta_calculo(datos):
-        """Valida los datos para calcular una ruta"""
+        """Valida los datos para calcular una ruta (los nombres deben ser
+        texto: con ellos se arma la clave de la caché de rutas)"""
         if not datos.get('origen') or not datos.get('destino'):
             return False, "Origen y destino son requeridos"
+        intermedios = datos.get('intermedios') or []
+        if not isinstance(intermedios, list):
+            return False, "intermedios debe ser una lista"
+        nombres = [datos['origen'], datos['destino'], *intermedios]
+        if datos.get('intermedio'):
+            nombres.append(datos['intermedio'])
+        if not all(isinstance(nombre, str) for nombre in nombres):
+            return False, "Los nombres de ciudades deben ser texto"
+        if not all(isinstance(datos.get(campo, ''), str)
+                   for campo in ('criterio', 'algoritmo')):
+            return False, "criterio y algoritmo deben ser texto"
+        return True, None
+
+    @staticmethod
+    def validar_datos_lote(datos):
+        """Valida la lista de pares de un cálculo de rutas por lote"""
+        pares = datos.get('pares')
+        if not isinstance(pares, list) or not pares:
+            return False, "Se requiere una lista 'pares' no vacía"
+        if len(pares) > MAX_PARES_LOTE:
+            return False, f"Máximo {MAX_PARES_LOTE} pares por lote"
+
+        for par in pares:
+            if isinstance(par, dict):
+                par = [par.get('origen'), par.get('destino')]
+            if not isinstance(par, list) or len(par) != 2 or not all(par):
+                return False, "Cada par debe tener origen y destino"
+        return True, None
+
+    @staticmethod
+    def formatear_respuesta_lote(resultados, criterio):
+        """Formatea los resultados compactos de un lote de rutas"""
+        return {
+            'status': 'success',
+            'criterio': criterio,
+            'total': len(resultados),
+            'resultados': resultados
+        }
+
+    @staticmethod
+    def validar_datos_matriz(ciudades, criterios, formato):
+        """Valida subconjunto de ciudades, criterios y formato de la matriz"""
+        if ciudades is not None:
+            if not isinstance(ciudades, list) or not ciudades:
+                return False, "'ciudades' debe ser una lista no vacía"
+            if len(ciudades) > MAX_CIUDADES_MATRIZ:
+                return False, f"Máximo {MAX_CIUDADES_MATRIZ} ciudades por matriz"
+        if not criterios or any(c not in CRITERIOS for c in criterios):
+            return False, "Criterio debe ser 'distancia', 'tiempo' o ambos"
+        if formato not in ('json', 'npy'):
+            return False, "Formato debe ser 'json' o 'npy'"
+        return True, None
+
+    @staticmethod
+    def formatear_respuesta_matriz(matrices):
+        """Formatea las matrices como listas JSON (sin camino → null)"""
+        respuesta = {
+            'status': 'success',
+            'ciudades': matrices['ciudades'],
+            'criterios': matrices['criterios']
+        }
+        for criterio in matrices['criterios']:
+            respuesta[criterio] = [
+                [None if math.isinf(valor) else valor for valor in fila]
+                for fila in matrices[criterio]
+            ]
+        return respuesta
+
+    @staticmethod
+    def serializar_npy(matrices):
+        """Serializa las matrices en formato NumPy .npy (float64).
+
+        La forma es (N, N) con un criterio o (C, N, N) con varios; los pares
+        sin camino quedan como inf.
+        """
+        n = len(matrices['ciudades'])
+        criterios = matrices['criterios']
+        forma = (n, n) if len(criterios) == 1 else (len(criterios), n, n)
+
+        datos = array.array('d')
+        for criterio in criterios:
+            for fila in matrices[criterio]:
+                datos.extend(fila)
+        if sys.byteorder == 'big':
+            datos.byteswap()
+
+        cabecera = "{'descr': '<f8', 'fortran_order': False, 'shape': %s, }" % (
+            repr(forma),)
+        # Cabecera v1.0: magic(6) + versión(2) + largo(2), alineada a 64 bytes
+        relleno = -(10 + len(cabecera) + 1) % 64
+        cabecera = (cabecera + ' ' * relleno + '\n').encode('latin1')
+
+        return (b'\x93NUMPY\x01\x00' + len(cabecera).to_bytes(2, 'little')
+                + cabecera + datos.tobytes())
+
+    @staticmethod
+    def formatear_respuesta_npy(matrices):
+        """Contenido .npy y el orden de filas/columnas (JSON ASCII para
+        poder enviarlo en cabeceras HTTP)"""
+        return {
+            'status': 'success',
+            'formato': 'npy',
+            'contenido': MapaView.serializar_npy(matrices),
+            'ciudades': json.dumps(matrices['ciudades']),
+            'criterios': ','.join(matrices['criterios'])
+        }
+
+    @staticmethod
+    def validar_datos_alternativas(datos):
+        """Valida origen, destino, k y criterio de rutas alternativas"""
+        if not datos.get('origen') or not datos.get('destino'):
+            return False, "Origen y destino son requeridos"
+        try:
+            k = int(datos.get('k') or 3)
+        except ValueError:
+            return False, "k debe ser un número entero"
+        if k < 1 or k > MAX_ALTERNATIVAS:
+            return False, f"k debe estar entre 1 y {MAX_ALTERNATIVAS}"
+        if datos.get('criterio', 'distancia') not in CRITERIOS:
+            return False, "Criterio debe ser 'distancia' o 'tiempo'"
+        return True, None
+
+    @staticmethod
+    def formatear_respuesta_alternativas(rutas, criterio):
+        """Formatea las k rutas alternativas ordenadas por costo"""
+        return {
+            'status': 'success',
+            'criterio': criterio,
+            'rutas': rutas
+        }
+
+    @staticmethod
+    def validar_datos_alcance(datos):
+        """Valida origen, presupuesto y criterio de una consulta de alcance"""
+        if not datos.get('origen'):
+            return False, "Origen es requerido"
+        try:
+            presupuesto = float(datos.get('presupuesto', ''))
+        except (TypeError, ValueError):
+            return False, "El presupuesto debe ser un número"
+        # NaN e infinito no son JSON válido en la respuesta
+        if not math.isfinite(presupuesto):
+            return False, "El presupuesto debe ser un número finito"
+        if presupuesto < 0:
+            return False, "El presupuesto debe ser positivo"
+        if datos.get('criterio', 'distancia') not in CRITERIOS:
+            return False, "Criterio debe ser 'distancia' o 'tiempo'"
+        return True, None
+
+    @staticmethod
+    def formatear_respuesta_alcance(origen, presupuesto, criterio, alcanzables):
+        """Formatea las ciudades alcanzables con su costo"""
+        return {
+            'status': 'success',
+            'origen': origen,
+            'presupuesto': presupuesto,
+            'criterio': criterio,
+            'total': len(alcanzables),
+            'ciudades': alcanzables
+        }
+
+    @staticmethod
+    def validar_datos_cercanas(datos):
+        """Valida el punto (x, y) y k de una consulta de ciudades cercanas"""
+        try:
+            punto = (float(datos.get('x', '')), float(datos.get('y', '')))
+        except ValueError:
+            return False, "x e y deben ser números"
+        if not all(map(math.isfinite, punto)):
+            return False, "x e y deben ser números finitos"
+        try:
+            k = int(datos.get('k', 1))
+        except ValueError:
+            return False, "k debe ser un entero"
+        if not 1 <= k <= MAX_CERCANAS:
+            return False, f"k debe estar entre 1 y {MAX_CERCANAS}"
+        return True, None
+
+    @staticmethod
+    def formatear_respuesta_cercanas(x, y, cercanas):
+        """Formatea las ciudades más cercanas a un punto"""
+        return {
+            'status': 'success',
+            'punto': [x, y],
+            'total': len(cercanas),
+            'ciudades': cercanas
+        }
+
+    @staticmethod
+    def validar_datos_rectangulo(datos):
+        """Valida los límites xmin, ymin, xmax, ymax de un rectángulo"""
+        try:
+            xmin, ymin, xmax, ymax = (
+                float(datos.get(campo, ''))
+                for campo in ('xmin', 'ymin', 'xmax', 'ymax'))
+        except ValueError:
+            return False, "xmin, ymin, xmax, ymax deben ser números"
+        if not all(map(math.isfinite, (xmin, ymin, xmax, ymax))):
+            return False, "xmin, ymin, xmax, ymax deben ser números finitos"
+        if xmin > xmax or ymin > ymax:
+            return False, "Rectángulo inválido: el mínimo supera al máximo"
+        return True, None
+
+    @staticmethod
+    def formatear_respuesta_rectangulo(rectangulo, ciudades):
+        """Formatea las ciudades dentro de un rectángulo"""
+        return {
+            'status': 'success',
+            'rectangulo': rectangulo,
+            'total': len(ciudades),
+            'ciudades': ciudades
+        }
+
+    @staticmethod
+    def formatear_trabajo_enviado(identificador):
+        """Respuesta inmediata de una consulta encolada como trabajo"""
+        return {
+            'status': 'success',
+            'trabajo': identificador,
+            'estado': 'pendiente',
+            'url': f'/api/trabajos/{identificador}'
+        }
+
+    @staticmethod
+    def validar_espera(espera):
+        """Valida los segundos que una consulta de trabajo puede esperar"""
+        try:
+            if float(espera) < 0:
+                return False, "La espera debe ser positiva"
+        except (TypeError, ValueError):
+            return False, "La espera debe ser un número"
+        return True, None
+
+    @staticmethod
+    def formatear_estado_trabajo(estado):
+        """Estado de un trabajo: pendiente, en_curso, completado o error"""
+        return {'status': 'success', **estado}
+
+    @staticmethod
+    def validar_formatos_importacion(formatos):
+        """Valida el formato (csv, ndjson, geojson) de cada archivo a importar"""
+        if not formatos:
+            return False, "Se requiere al menos un archivo en el campo 'archivos'"
+        for formato in formatos:
+            if formato not in FORMATOS_IMPORTACION:
+                return False, (f"Formato no reconocido: use {', '.join(FORMATOS_IMPORTACION)} "
+                               "(por extensión del archivo o el campo 'formato')")
+        return True, None
+
+    @staticmethod
+    def formatear_respuesta_importacion(ciudades, rutas, version, segundos):
+        """Resumen de una importación masiva"""
+        return {
+            'status': 'success',
+            'ciudades': ciudades,
+            'rutas': rutas,
+            'version': version,
+            'segundos': round(segundos, 3)
+        }
+
+    @staticmethod
+    def leer_salida(valor):
+        """Hora de salida en horas (7.5 o "07:30"); None si no se indicó.
+        Lanza ValueError si el formato no es válido"""
+        if valor is None or valor == '':
+            return None
+        try:
+            if isinstance(valor, str) and ':' in valor:
+                horas, minutos = valor.split(':')
+                salida = int(horas) + int(minutos) / 60
+            else:
+                salida = float(valor)
+        except (TypeError, ValueError):
+            raise ValueError("salida debe ser una hora: número de horas o HH:MM")
+        if not 0 <= salida < math.inf:
+            raise ValueError("salida debe ser una hora no negativa")
+        return salida
+
+    @staticmethod
+    def validar_datos_perfil(datos):
+        """Valida la ruta y los puntos de un perfil de tiempo"""
+        if not datos.get('ciudad1') or not datos.get('ciudad2'):
+            return False, "Ambas ciudades son requeridas"
+        if not isinstance(datos.get('horas'), list) or not isinstance(
+                datos.get('tiempos'), list):
+            return False, "Se requieren las listas 'horas' y 'tiempos'"
         return True, None